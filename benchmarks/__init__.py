@@ -0,0 +1,18 @@
+"""GraiaX Shortcut 性能基准.
+
+- `python -m benchmarks`: Commander 注册, 分词, 执行延迟与内存
+- `python -m benchmarks.convert`: 参数转换器与 pydantic 校验对比
+- `python -m benchmarks.reload`: 反复重载命令时匹配树与内存是否有界
+- `python -m benchmarks.dispatch`: 单命令匹配时直接执行与 Task 执行对比
+- `python -m benchmarks.split`: 分词引擎与逐字符实现的等价性及吞吐量
+- `python -m benchmarks.lazy`: 长消息上按需分词与完整分词的匹配耗时
+- `python -m benchmarks.overload`: 同一节点上的重载命令逐个扫描与共用剩余 token 索引对比
+- `python -m benchmarks.profiling`: CommandProfiler 开启与关闭时的执行延迟
+- `python -m benchmarks.fields`: 立即与延迟生成 ModelField 时的启动耗时与内存
+- `python -m benchmarks.memory`: 注册命令占用的堆内存
+- `python -m benchmarks.suggest`: 近似查找命令首 token 的索引与逐个比较对比
+- `python -m benchmarks.keyword`: ContainKeyword / DetectSuffix 逐个扫描与共用自动机对比
+- `python -m benchmarks.derived`: 各监听器各自计算与经由 DerivedCache 共用消息派生数据 (分词结果, 字符串形式等) 对比
+- `python -m benchmarks.regex`: MatchRegex 逐个运行与经由 RegexRouter 对比
+- `python -m benchmarks.template`: MatchTemplate 逐个元素检查与预编译模板 + 形状索引对比
+"""
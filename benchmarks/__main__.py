@@ -0,0 +1,3 @@
+from .commander import main
+
+main()
@@ -0,0 +1,93 @@
+"""Commander 基准: 注册, MatchNode.push, split 吞吐, execute 延迟与内存.
+
+用法: python -m benchmarks [--sizes 10 1000 100000] [--messages 2000]
+"""
+from __future__ import annotations
+
+import gc
+import time
+from typing import Any, Dict, List
+
+from graia.amnesia.message import MessageChain
+
+from graiax.shortcut.commander import CommandEntry, Commander
+from graiax.shortcut.commander._util import MatchNode, iter_split
+
+from .corpus import CommandSpec, make_commands, make_messages
+from .harness import arguments, percentiles, print_columns, rss, timed
+from .stub import make_commander
+
+
+def handler(**kwargs: Any) -> None:
+    ...
+
+
+def register(commander: Commander, specs: List[CommandSpec]) -> None:
+    for spec in specs:
+        commander.command(spec.command, dict(spec.settings))(handler)
+
+
+def bench_split(messages: List[MessageChain], rounds: int = 3) -> Dict[str, float]:
+    size = sum(len(str(chain)) for chain in messages)
+    best = min(timed(lambda: [list(iter_split(chain)) for chain in messages]) for _ in range(rounds))
+    return {"msg/s": len(messages) / best, "MB/s": size / best / 1e6}
+
+
+def bench_execute(commander: Commander, messages: List[MessageChain]) -> List[float]:
+    loop = commander.broadcast.loop
+    samples: List[float] = []
+
+    async def run() -> None:
+        for chain in messages:
+            start = time.perf_counter()
+            await commander.execute(chain)
+            samples.append(time.perf_counter() - start)
+
+    loop.run_until_complete(run())
+    return samples
+
+
+def run_size(size: int, message_count: int) -> Dict[str, Any]:
+    gc.collect()
+    base_rss = rss()
+    specs = make_commands(size)
+    commander = make_commander()
+
+    register_time = timed(lambda: register(commander, specs))
+    registered_rss = rss()
+
+    entries: List[CommandEntry] = list(commander.entries)
+    root: MatchNode[CommandEntry] = MatchNode()
+    push_time = timed(lambda: [root.push(entry) for entry in entries])
+
+    messages = make_messages(specs, message_count)
+    split_stats = bench_split(messages)
+    samples = bench_execute(commander, messages)
+    p50, p90, p99 = percentiles(samples)
+
+    result = {
+        "commands": size,
+        "register (s)": register_time,
+        "push (s)": push_time,
+        "split (msg/s)": split_stats["msg/s"],
+        "split (MB/s)": split_stats["MB/s"],
+        "exec p50 (us)": p50 * 1e6,
+        "exec p90 (us)": p90 * 1e6,
+        "exec p99 (us)": p99 * 1e6,
+        "executed": commander.broadcast.executed,  # type: ignore
+        "split hits": commander.split_cache.hits,
+        "rejected": commander.stats.rejected,
+        "walked": commander.stats.walked,
+        "RSS (MB)": (registered_rss - base_rss) / 2**20,
+    }
+    commander.broadcast.loop.close()
+    return result
+
+
+def main() -> None:
+    args = arguments(__doc__, sizes=[10, 100, 1000, 10000, 100000], messages=2000)
+    print_columns(run_size(size, args.messages) for size in args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""对比预编译转换器与 pydantic 校验在单次匹配中的参数编译耗时.
+
+用法: python -m benchmarks.convert [--number 20000]
+"""
+import timeit
+from typing import List
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut._typing_util import Sentinel
+from graiax.shortcut.commander import Arg, CommandEntry, Commander, ParamDesc
+from graiax.shortcut.commander._convert import pydantic_converter
+from graiax.shortcut.commander._util import split
+
+from .harness import arguments
+from .stub import make_commander
+
+CASES = {
+    "str slots": ("greet {name} {title}", {}, "greet alice doctor"),
+    "int slots": ("add {a: int} {b: int}", {}, "add 1 2"),
+    "optional": ("roll {dice: int} {times: int = 1}", {}, "roll 6"),
+    "wildcard raw": ("echo {...content: raw}", {}, "echo a b c d"),
+    "wildcard list": ("sum {...nums: int}", {}, "sum 1 2 3 4 5"),
+    "args": ("search {kw}", {"limit": Arg("-n {limit}", int, 10), "exact": Arg("--exact")}, "search foo -n 5 --exact"),
+}
+
+
+def register(commander: Commander, command: str, settings: dict) -> CommandEntry:
+    func = commander.command(command, dict(settings))(lambda **_: None)
+    return next(entry for entry in commander.entries if entry.callable is func)
+
+
+def descs(entry: CommandEntry) -> List[ParamDesc]:
+    return [*entry.slot_map.values(), *entry.arg_map.values(), *entry.optional, *filter(None, [entry.wildcard])]
+
+
+def bench(commander: Commander, entry: CommandEntry, chain: MessageChain, number: int) -> float:
+    frags = split(chain)
+    index = len(entry.nodes)
+    params = tuple(frags[i] for i, node in enumerate(entry.nodes) if node is Sentinel)
+    assert commander.parse_rest(index, frags, params, entry), "benchmark case doesn't match"
+    timer = timeit.Timer(lambda: commander.parse_rest(index, frags, params, entry))
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main() -> None:
+    number = arguments(__doc__, number=20000).number
+    commander = make_commander()
+    print(f"{'case':<16}{'pydantic (us)':>16}{'compiled (us)':>16}{'speedup':>10}")
+    for name, (command, settings, text) in CASES.items():
+        entry = register(commander, command, settings)
+        chain = MessageChain([Text(text)])
+        compiled = bench(commander, entry, chain, number)
+        saved = {desc: desc.converter for desc in descs(entry)}
+        for desc in saved:
+            desc.converter = pydantic_converter(desc.field, desc.dest)
+        legacy = bench(commander, entry, chain, number)
+        for desc, converter in saved.items():
+            desc.converter = converter
+        print(f"{name:<16}{legacy * 1e6:>16.2f}{compiled * 1e6:>16.2f}{legacy / compiled:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""合成的命令集与消息语料."""
+from __future__ import annotations
+
+import random
+from typing import Dict, List, NamedTuple, Union
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.commander import Arg, Slot
+
+WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet",
+    "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango",
+]  # fmt: skip
+
+CHAT = [
+    "今天天气不错",
+    "有人一起打游戏吗",
+    "hahaha",
+    "刚刚那个视频笑死我了",
+    "晚上吃什么",
+    "good morning everyone",
+    "这个 bug 修了吗",
+    "+1",
+]
+
+
+class CommandSpec(NamedTuple):
+    command: str
+    settings: Dict[str, Union[Slot, Arg]]
+    sample: str  # 一条能触发该命令的消息
+
+
+def _head(index: int) -> str:
+    return f"{WORDS[index % len(WORDS)]}{index}"
+
+
+def make_commands(count: int, seed: int = 0) -> List[CommandSpec]:
+    """生成 count 条混合了别名, 参数, 可选参数, wildcard 与 Arg 的命令."""
+    rand = random.Random(seed)
+    specs: List[CommandSpec] = []
+    for index in range(count):
+        head = _head(index)
+        kind = index % 6
+        if kind == 0:
+            specs.append(CommandSpec(head, {}, head))
+        elif kind == 1:
+            specs.append(CommandSpec(f"[{head}|a{head}] {{target}}", {}, f"a{head} {rand.choice(WORDS)}"))
+        elif kind == 2:
+            specs.append(CommandSpec(f"{head} {{count: int}} {{unit = 'x'}}", {}, f"{head} {rand.randint(0, 99)}"))
+        elif kind == 3:
+            specs.append(CommandSpec(f"{head} say {{...content: raw}}", {}, f"{head} say {' '.join(WORDS[:5])}"))
+        elif kind == 4:
+            settings: Dict[str, Union[Slot, Arg]] = {
+                "verbose": Arg("[-v|--verbose]"),
+                "limit": Arg("--limit {limit}", int, 10),
+            }
+            specs.append(CommandSpec(f"{head} {{keyword}}", settings, f"{head} {rand.choice(WORDS)} --limit 3 -v"))
+        else:
+            sub = WORDS[index % 7]
+            specs.append(CommandSpec(f"{head} {sub} {{a}} {{b}}", {}, f"{head} {sub} 1 2"))
+    return specs
+
+
+def make_messages(specs: List[CommandSpec], count: int, hit_rate: float = 0.2, seed: int = 0) -> List[MessageChain]:
+    """生成 count 条消息, 其中约 hit_rate 的比例能触发命令, 其余为闲聊与长文本."""
+    rand = random.Random(seed)
+    messages: List[MessageChain] = []
+    for _ in range(count):
+        roll = rand.random()
+        if specs and roll < hit_rate:
+            text = rand.choice(specs).sample
+        elif roll < hit_rate + (1 - hit_rate) * 0.9:
+            text = rand.choice(CHAT)
+        else:
+            text = " ".join(rand.choice(WORDS) for _ in range(rand.randint(100, 400)))
+        messages.append(MessageChain([Text(text)]))
+    return messages
@@ -0,0 +1,104 @@
+"""消息派生数据的共用: 各监听器各自计算与经由 DerivedCache 共用的对比.
+
+commanders 一行为多个 Commander 按需分词, decorators 一行为 MatchContent / MatchRegex / FuzzyMatch / ContainKeyword 混合.
+共用的结果与直接计算是否相同由 tests/test_split.py 与 tests/test_text_parser.py 检查.
+
+用法: python -m benchmarks.derived [--listeners 10 100] [--lengths 20 500] [--events 50]
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+from contextvars import ContextVar
+from typing import Any, Callable, List, Sequence, TypeVar
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.commander import ChainContent, Commander, LRUSplitCache
+from graiax.shortcut.commander._util import LazySplit, iter_split
+from graiax.shortcut.text_parser import (
+    ContainKeyword,
+    FuzzyMatch,
+    MatchContent,
+    MatchRegex,
+)
+from tests.reference import At
+
+from .corpus import CHAT, WORDS
+from .detector import per_message
+from .harness import arguments, per_item
+from .stub import StubBroadcast
+
+T = TypeVar("T")
+
+
+class ReferenceCommander(Commander):
+    """每个 Commander 各自按需分词"""
+
+    def split(self, chain: MessageChain, sampled: bool = False) -> Sequence[ChainContent]:
+        return LazySplit(self.split_cache.lookup(chain) or iter_split(chain))
+
+
+def uncached(cls: type) -> type:
+    """每次调用都直接计算派生数据的 cls"""
+
+    def derive(chain: MessageChain, factory: Callable[[MessageChain], T]) -> T:
+        return factory(chain)
+
+    return type(f"Uncached{cls.__name__}", (cls,), {"derive": staticmethod(derive)})
+
+
+def make_decorators(count: int, wrap: Callable[[type], type] = lambda cls: cls) -> List[Any]:
+    decorators: List[Any] = []
+    for index in range(count):
+        word = WORDS[index % len(WORDS)]
+        cls, arg = [(MatchContent, word), (MatchRegex, f".*{word}.*"), (FuzzyMatch, word), (ContainKeyword, word)][
+            index % 4
+        ]
+        decorators.append(wrap(cls)(arg))
+    return decorators
+
+
+def make_chain(length: int, rand: random.Random) -> MessageChain:
+    """含有非文本元素, 因此 LRUSplitCache 不会缓存"""
+    words: List[str] = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rand.choice(WORDS + CHAT))
+    return MessageChain([At(1), Text(" " + " ".join(words))])
+
+
+def commanders(cls: type, count: int, chains: List[MessageChain]) -> float:
+    loop = asyncio.new_event_loop()
+    split_cache = LRUSplitCache()
+    instances = []
+    for index in range(count):
+        commander = cls(StubBroadcast(loop), ContextVar("event"), split_cache=split_cache)  # type: ignore
+        commander.command(f"{{who}} {WORDS[index % len(WORDS)]} {{...rest}}")(lambda who, rest: None)
+        instances.append(commander)
+    elapsed = per_item(lambda chain: [commander.match(commander.split(chain)) for commander in instances], chains)
+    loop.close()
+    return elapsed
+
+
+def main() -> None:
+    args = arguments(__doc__, listeners=[10, 100], lengths=[20, 500], events=50)
+    rand = random.Random(1)
+    for count in args.listeners:
+        for length in args.lengths:
+            chains = [make_chain(length, rand) for _ in range(args.events)]
+            before = commanders(ReferenceCommander, count, chains)
+            after = commanders(Commander, count, chains)
+            print(
+                f"commanders  listeners {count:>4}  chars {length:>4}  "
+                f"separate {before * 1e6:9.2f}us  shared {after * 1e6:9.2f}us  x{before / after:.1f}"
+            )
+            before = per_message(make_decorators(count, uncached), chains)
+            after = per_message(make_decorators(count), chains)
+            print(
+                f"decorators  listeners {count:>4}  chars {length:>4}  "
+                f"separate {before * 1e6:9.2f}us  shared {after * 1e6:9.2f}us  x{before / after:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
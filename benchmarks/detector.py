@@ -0,0 +1,50 @@
+"""text_parser 中各检测器的基准共用的消息构造与计时工具."""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, List
+
+from graia.amnesia.message import MessageChain
+from graia.broadcast import Broadcast, Dispatchable
+from graia.broadcast.entities.dispatcher import BaseDispatcher
+from graia.broadcast.interfaces.dispatcher import DispatcherInterface
+
+from tests.reference import run
+
+from .harness import per_item
+
+
+def per_message(detectors: List[Any], chains: List[MessageChain]) -> float:
+    """每条消息依次交给所有检测器, 返回平均每条消息的耗时 (秒)"""
+    return per_item(lambda chain: [run(detector(chain, None)) for detector in detectors], chains)
+
+
+class MessageEvent(Dispatchable):
+    def __init__(self, chain: MessageChain) -> None:
+        self.chain = chain
+
+    class Dispatcher(BaseDispatcher):
+        @staticmethod
+        async def catch(interface: DispatcherInterface):
+            if interface.name == "message_chain":
+                return interface.event.chain
+
+
+def end_to_end(detectors: List[Any], chains: List[MessageChain]) -> float:
+    """每个检测器注册为一个监听器, 经 Broadcast 分发每条消息, 返回平均每条消息的耗时 (秒)"""
+    loop = asyncio.new_event_loop()
+    broadcast = Broadcast(loop=loop)
+    for detector in detectors:
+        broadcast.receiver(MessageEvent, decorators=[detector])(lambda: None)
+
+    async def post_all() -> float:
+        start = time.perf_counter()
+        for chain in chains:
+            await broadcast.postEvent(MessageEvent(chain))
+        return (time.perf_counter() - start) / len(chains)
+
+    try:
+        return loop.run_until_complete(post_all())
+    finally:
+        loop.close()
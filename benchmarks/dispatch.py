@@ -0,0 +1,32 @@
+"""对比单命令匹配时直接执行与创建 Task 执行的开销.
+
+用法: python -m benchmarks.dispatch [--number 20000]
+"""
+from __future__ import annotations
+
+from graia.amnesia.message import MessageChain, Text
+
+from .commander import bench_execute
+from .harness import arguments, percentiles
+from .stub import make_commander
+
+
+def measure(inline: bool, number: int) -> list:
+    commander = make_commander()
+    commander.inline = inline
+    commander.command("ping {target}")(lambda target: None)
+    samples = bench_execute(commander, [MessageChain([Text("ping pong")])] * number)
+    commander.broadcast.loop.close()
+    return samples
+
+
+def main() -> None:
+    number = arguments(__doc__, number=20000).number
+    print(f"{'mode':<8}{'p50 (us)':>12}{'p90 (us)':>12}{'p99 (us)':>12}")
+    for mode, inline in (("task", False), ("inline", True)):
+        p50, p90, p99 = percentiles(measure(inline, number))
+        print(f"{mode:<8}{p50 * 1e6:>12.2f}{p90 * 1e6:>12.2f}{p99 * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
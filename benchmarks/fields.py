@@ -0,0 +1,53 @@
+"""立即与延迟生成 ModelField 时的启动耗时与内存.
+
+每种情况在新的进程中运行: 从导入 Commander 到注册完所有命令的耗时 (import-to-ready), 注册带来的 RSS 增量,
+以及延迟模式下 `Commander.prewarm` 的耗时与首条消息的执行延迟.
+
+用法: python -m benchmarks.fields [--sizes 1000 10000]
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict
+
+from .harness import arguments, in_new_process, rss, timed
+
+
+def run_process(size: int, lazy: bool) -> Dict[str, float]:
+    start = time.perf_counter()
+    from .commander import register
+    from .corpus import make_commands, make_messages
+    from .stub import make_commander
+
+    base_rss = rss()
+    specs = make_commands(size)
+    commander = make_commander()
+    commander.lazy_fields = lazy
+    register(commander, specs)
+    result = {"ready (s)": time.perf_counter() - start, "RSS (MB)": (rss() - base_rss) / 2**20}
+
+    loop = commander.broadcast.loop
+    commander.freeze()
+    chain = make_messages(specs[2:3], 1, hit_rate=1)[0]  # a command with an int Slot
+    result["first exec (us)"] = timed(lambda: loop.run_until_complete(commander.execute(chain))) * 1e6
+    result["prewarm (s)"] = timed(lambda: loop.run_until_complete(commander.prewarm()))
+    result["warm RSS (MB)"] = (rss() - base_rss) / 2**20
+    loop.close()
+    return result
+
+
+def main() -> None:
+    args = arguments(__doc__, sizes=[1000, 10000])
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    for size in args.sizes:
+        for lazy in (False, True):
+            rows[f"{size} {'lazy' if lazy else 'eager'}"] = in_new_process(run_process, size, lazy)
+    keys = next(iter(rows.values())).keys()
+    print(f"{'':<18}" + "".join(f"{key:>16}" for key in keys))
+    for name, row in rows.items():
+        print(f"{name:<18}" + "".join(f"{row[key]:>16.3f}" for key in keys))
+
+
+if __name__ == "__main__":
+    main()
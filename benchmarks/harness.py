@@ -0,0 +1,92 @@
+"""各基准共用的命令行参数, 计时与输出工具."""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def arguments(doc: str, **defaults: Any) -> argparse.Namespace:
+    """以模块文档为说明, 按默认值生成并解析命令行参数.
+
+    参数名中的下划线对应命令行中的 `-`. 列表默认值对应可接受多个值的参数 (类型取自第一个元素),
+    True 对应 `--no-<name>` 开关, False 对应 `--<name>` 开关, 其余按默认值的类型转换.
+
+    Example:
+        >>> args = arguments(__doc__, sizes=[1000, 10000], queries=500, lazy=False)
+    """
+    parser = argparse.ArgumentParser(description=doc, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for name, default in defaults.items():
+        flag = name.replace("_", "-")
+        if isinstance(default, bool):
+            action = "store_false" if default else "store_true"
+            parser.add_argument(f"--no-{flag}" if default else f"--{flag}", dest=name, action=action)
+        elif isinstance(default, list):
+            parser.add_argument(f"--{flag}", type=type(default[0]), nargs="+", default=default)
+        else:
+            parser.add_argument(f"--{flag}", type=type(default), default=default)
+    return parser.parse_args()
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def per_item(func: Callable[[T], Any], items: Sequence[T]) -> float:
+    """对每个 item 调用 func, 返回平均每个 item 的耗时 (秒)"""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def interleaved(*funcs: Callable[[], float], rounds: int = 5) -> List[float]:
+    """交替运行各个计时函数, 取各自的最小值, 使两者受到的干扰相近"""
+    samples: List[List[float]] = [[] for _ in funcs]
+    for _ in range(rounds):
+        for func, collected in zip(funcs, samples):
+            collected.append(func())
+    return [min(collected) for collected in samples]
+
+
+def percentiles(samples: Sequence[float], points: Sequence[float] = (50, 90, 99)) -> List[float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return [0.0 for _ in points]
+    return [ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points]
+
+
+def rss() -> int:
+    """当前进程的常驻内存 (字节)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+def in_new_process(func: Callable[..., T], *args: Any) -> T:
+    """在新启动的进程中运行 func, 用于测量导入与注册等只在启动时发生的开销"""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+def print_columns(rows: Iterable[Dict[str, Any]], precision: int = 2) -> None:
+    """每个 row 占一列, 每个键占一行"""
+    rows = list(rows)
+    for key in rows[0]:
+        cells = "".join(
+            f"{row[key]:>14.{precision}f}" if isinstance(row[key], float) else f"{row[key]:>14}" for row in rows
+        )
+        print(f"{key:<16}{cells}")
@@ -0,0 +1,51 @@
+"""ContainKeyword: 逐个监听器扫描消息与共用自动机的对比.
+
+两种方式的等价性由 tests/test_text_parser.py 检查.
+decorator 一行只计检测器本身, broadcast 一行为经 Broadcast 分发到所有监听器的完整耗时.
+
+用法: python -m benchmarks.keyword [--listeners 30 300] [--lengths 20 200] [--events 50]
+"""
+from __future__ import annotations
+
+import random
+from typing import List
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.text_parser import ContainKeyword
+from tests.reference import ReferenceKeyword
+
+from .corpus import CHAT
+from .detector import end_to_end, per_message
+from .harness import arguments
+
+
+def make_words(count: int, seed: int = 0) -> List[str]:
+    rand = random.Random(seed)
+    chars = "".join(sorted(set("".join(CHAT))))
+    return ["".join(rand.choice(chars) for _ in range(rand.randint(2, 4))) for _ in range(count)]
+
+
+def main() -> None:
+    args = arguments(__doc__, listeners=[30, 300], lengths=[20, 200], events=50)
+    rand = random.Random(1)
+    for count in args.listeners:
+        words = make_words(count)
+        for length in args.lengths:
+            chains = []
+            for _ in range(args.events):
+                text = ""
+                while len(text) < length:
+                    text += rand.choice(CHAT)
+                chains.append(MessageChain([Text(text[:length])]))
+            for name, measure in (("decorator", per_message), ("broadcast", end_to_end)):
+                before = measure([ReferenceKeyword(w) for w in words], chains)
+                after = measure([ContainKeyword(w) for w in words], chains)
+                print(
+                    f"listeners {count:>4}  chars {length:>4}  {name:<9}  "
+                    f"per-listener {before * 1e6:9.2f}us  shared {after * 1e6:9.2f}us  x{before / after:.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""长消息上按需分词与完整分词的匹配耗时对比.
+
+用法: python -m benchmarks.lazy [--words 10 100 1000 10000]
+"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.commander import Commander, Slot
+from graiax.shortcut.commander._util import LazySplit, iter_split
+
+from .harness import arguments, timed
+from .stub import make_commander
+
+
+def handler(**kwargs: Any) -> None:
+    ...
+
+
+def prepare() -> Commander:
+    commander = make_commander()
+    commander.command("ping {target}")(handler)
+    commander.command("echo {...content: str}")(handler)
+    commander.command("roll {count} [sides]", {"count": Slot("count", int), "sides": Slot("sides", int, 6)})(handler)
+    return commander
+
+
+def run_words(commander: Commander, words: int, rounds: int = 200) -> Dict[str, float]:
+    chain = MessageChain([Text("ping " + " ".join(f"w{i}" for i in range(words)))])
+    full = timed(lambda: [commander.match(list(iter_split(chain))) for _ in range(rounds)]) / rounds
+    lazy = timed(lambda: [commander.match(LazySplit(iter_split(chain))) for _ in range(rounds)]) / rounds
+    return {"words": words, "full (us)": full * 1e6, "lazy (us)": lazy * 1e6, "speedup": full / lazy}
+
+
+def main() -> None:
+    args = arguments(__doc__, words=[10, 100, 1000, 10000])
+    commander = prepare()
+    for words in args.words:
+        row = run_words(commander, words)
+        print("".join(f"{k}: {v:<12.2f}" if isinstance(v, float) else f"{k}: {v:<8}" for k, v in row.items()))
+    commander.broadcast.loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""注册命令占用的堆内存, 按分配位置分组.
+
+--accounts 模拟多个账号各自持有一个 Commander, 注册同一组命令. --suggest 同时计入 `suggest` 第一次调用时建立的索引.
+
+用法: python -m benchmarks.memory [--sizes 1000 10000] [--accounts 1] [--top 8] [--suggest]
+"""
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from graiax.shortcut.commander import Commander
+
+from .commander import register
+from .corpus import make_commands
+from .harness import arguments
+from .stub import make_commander
+
+
+def count_nodes(commander: Commander) -> int:
+    return len(commander.freeze())
+
+
+def run_size(
+    size: int, accounts: int, top: int, suggest: bool = False
+) -> Tuple[Dict[str, Any], List[tracemalloc.StatisticDiff]]:
+    specs = make_commands(size)
+    commanders = [make_commander() for _ in range(accounts)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for commander in commanders:
+        register(commander, specs)
+        if suggest:
+            commander.suggest("")
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "lineno")
+    total = sum(stat.size_diff for stat in diff)
+    result = {
+        "commands": size * accounts,
+        "heap (MB)": total / 2**20,
+        "per command (KB)": total / size / accounts / 1024,
+        "nodes": sum(count_nodes(commander) for commander in commanders),
+    }
+    for commander in commanders:
+        commander.broadcast.loop.close()
+    return result, diff[:top]
+
+
+def main() -> None:
+    args = arguments(__doc__, sizes=[1000, 10000], accounts=1, top=8, suggest=False)
+    for size in args.sizes:
+        result, top = run_size(size, args.accounts, args.top, args.suggest)
+        print(
+            "  ".join(
+                f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}"
+                for key, value in result.items()
+            )
+        )
+        for stat in top:
+            frame = stat.traceback[0]
+            print(f"    {stat.size_diff / 1024:>10.1f} KB  {frame.filename.rsplit('/', 3)[-1]}:{frame.lineno}")
+
+
+if __name__ == "__main__":
+    main()
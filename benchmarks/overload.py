@@ -0,0 +1,91 @@
+"""同一节点上的多个重载命令: 逐个扫描剩余 token 与共用 TailIndex 的对比.
+
+命令只在 Arg 与可选 Slot 上不同, 会在匹配树的同一状态结束. 两种方式的等价性由 tests/test_overload.py 检查.
+
+用法: python -m benchmarks.overload [--entries 1 8 64] [--lengths 4 32 256]
+"""
+from __future__ import annotations
+
+import random
+import timeit
+from typing import FrozenSet, List, Tuple
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.commander import Arg, CommandEntry, Commander, TailIndex
+from graiax.shortcut.commander._util import ChainContent, ChainContentList, split
+from tests.reference import reference_scan
+
+from .corpus import WORDS
+from .harness import arguments
+from .stub import make_commander
+
+FLAGS = ["-v", "-q", "--all", "--force", "-n", "--limit", "--user", "--tag"]
+
+
+def register(commander: Commander, count: int, seed: int = 0) -> List[CommandEntry]:
+    rand = random.Random(seed)
+    entries: List[CommandEntry] = []
+    for index in range(count):
+        flags = rand.sample(FLAGS, rand.randint(1, 4))
+        settings = {f"a{i}": Arg(f"{flag} {{value}}", str, "") if i % 2 else Arg(flag) for i, flag in enumerate(flags)}
+        command = "run {target} {...rest}" if index % 3 == 0 else "run {target} {extra = ''}"
+        func = commander.command(command, settings)(lambda **_: None)
+        entries.append(next(entry for entry in commander.entries if entry.callable is func))
+    return entries
+
+
+def make_message(length: int, rand: random.Random, unique: bool = False) -> MessageChain:
+    """unique 为 True 时每个 Arg 头至多出现一次, 否则会大量重复 (多数命令在第一个重复处即失败)"""
+    if unique:
+        words = [rand.choice(WORDS) for _ in range(length)]
+        for flag in rand.sample(FLAGS, min(len(FLAGS), length // 4)):
+            words[rand.randrange(len(words))] = flag
+    else:
+        words = [rand.choice(FLAGS) if rand.random() < 0.3 else rand.choice(WORDS) for _ in range(length)]
+    return MessageChain([Text(" ".join(["run", *words]))])
+
+
+def state_headers(commander: Commander) -> FrozenSet[str]:
+    """重载命令所在状态的 Arg 头, 与 `match` 使用的相同"""
+    automaton = commander.freeze()
+    return next(headers for entries, headers in zip(automaton.entries, commander._arg_headers) if entries)
+
+
+def shared(
+    commander: Commander,
+    entries: List[CommandEntry],
+    headers: FrozenSet[str],
+    frags: ChainContentList,
+    params: Tuple[ChainContent, ...],
+) -> list:
+    tail = TailIndex(frags, 2, headers)
+    return [commander.scan_rest(2, frags, params, entry, tail) for entry in entries]
+
+
+def separate(entries: List[CommandEntry], frags: ChainContentList, params: Tuple[ChainContent, ...]) -> list:
+    return [reference_scan(2, frags, params, entry) for entry in entries]
+
+
+def main() -> None:
+    args = arguments(__doc__, entries=[1, 8, 64], lengths=[4, 32, 256])
+    rand = random.Random(1)
+    for count in args.entries:
+        commander = make_commander()
+        entries = register(commander, count)
+        headers = state_headers(commander)
+        for length in args.lengths:
+            frags = split(make_message(length, rand, unique=True))
+            params = (frags[1],)
+            number = max(1, 20000 // (count * length))
+            old = timeit.timeit(lambda: separate(entries, frags, params), number=number) / number
+            new = timeit.timeit(lambda: shared(commander, entries, headers, frags, params), number=number) / number
+            print(
+                f"entries {count:>3}  tokens {length:>4}  "
+                f"per-entry {old * 1e6:9.2f}us  shared {new * 1e6:9.2f}us  x{old / new:.1f}"
+            )
+        commander.broadcast.loop.close()
+
+
+if __name__ == "__main__":
+    main()
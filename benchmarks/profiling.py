@@ -0,0 +1,45 @@
+"""CommandProfiler 的开销: 关闭, 只计数与每条消息计时三种情况下的 execute 延迟.
+
+用法: python -m benchmarks.profiling [--commands 1000] [--messages 5000]
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from graiax.shortcut.commander import CommandProfiler, EntryReport
+
+from .commander import bench_execute, register
+from .corpus import make_commands, make_messages
+from .harness import arguments, percentiles
+from .stub import make_commander
+
+
+def run(profiler: Optional[CommandProfiler], commands: int, messages: int) -> Tuple[List[float], List[EntryReport]]:
+    specs = make_commands(commands)
+    commander = make_commander()
+    commander.profiler = profiler
+    register(commander, specs)
+    samples = bench_execute(commander, make_messages(specs, messages))
+    commander.broadcast.loop.close()
+    return percentiles(samples), profiler.report() if profiler else []
+
+
+def main() -> None:
+    args = arguments(__doc__, commands=1000, messages=5000)
+    cases = {
+        "off": None,
+        "sample 1/64": CommandProfiler(64),
+        "sample 1/1": CommandProfiler(1),
+    }
+    for name, profiler in cases.items():
+        (p50, p90, p99), report = run(profiler, args.commands, args.messages)
+        print(f"{name:<14}p50 {p50 * 1e6:8.2f}us  p90 {p90 * 1e6:8.2f}us  p99 {p99 * 1e6:8.2f}us")
+        for row in report[:3]:
+            print(
+                f"  {row.entry!r:<40} attempts={row.attempts} failures={row.failures} dispatches={row.dispatches}"
+                f" validate={row.validate * 1e6:.2f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
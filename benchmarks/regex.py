@@ -0,0 +1,74 @@
+"""MatchRegex: 逐个监听器运行正则表达式与经由 RegexRouter 的对比.
+
+经由路由的结果 (包括 span 与各分组) 与直接匹配相同由 tests/test_text_parser.py 检查.
+
+用法: python -m benchmarks.regex [--listeners 30 300] [--lengths 20 500] [--events 100]
+"""
+from __future__ import annotations
+
+import random
+import re
+from typing import List
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut._util import literal_runs
+from graiax.shortcut.text_parser import MatchRegex, RegexRouter
+
+from .corpus import CHAT, WORDS
+from .detector import per_message
+from .harness import arguments, interleaved
+
+
+def make_regexes(kind: str, count: int, seed: int = 0) -> List[str]:
+    """command: 命令式, 带有字面量前缀; keyword: `.*关键字.*`; shared: 少数正则表达式被多个监听器重复使用"""
+    rand = random.Random(seed)
+    regexes: List[str] = []
+    for index in range(count):
+        word = f"{rand.choice(WORDS)}{index}"
+        if kind == "keyword":
+            regexes.append(f".*{word}.*")
+        elif kind == "shared":
+            regexes.append(rf"(?P<name>\w+) (?P<value>[0-9]+) {WORDS[index % 5]}")
+        elif index % 2:
+            regexes.append(f"/{word} (?P<arg>.+)")
+        else:
+            regexes.append(f"#{word}(?: (?P<count>[0-9]+))?")
+    return regexes
+
+
+def make_chains(regexes: List[str], length: int, events: int, rand: random.Random) -> List[MessageChain]:
+    """一半为闲聊, 一半含有某个正则表达式的字面量"""
+    chains: List[MessageChain] = []
+    for index in range(events):
+        words = [max(literal_runs(re.compile(rand.choice(regexes))), key=len)] if index % 2 else []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(rand.choice(WORDS + CHAT))
+        chains.append(MessageChain([Text(" ".join(words))]))
+    return chains
+
+
+def compare(regexes: List[str], chains: List[MessageChain]) -> List[float]:
+    router = RegexRouter()
+    separate = [MatchRegex(regex) for regex in regexes]
+    routed = [MatchRegex(regex, router=router) for regex in regexes]
+    return interleaved(lambda: per_message(separate, chains), lambda: per_message(routed, chains))
+
+
+def main() -> None:
+    args = arguments(__doc__, listeners=[30, 300], lengths=[20, 500], events=100)
+    rand = random.Random(1)
+    for kind in ("command", "keyword", "shared"):
+        for count in args.listeners:
+            regexes = make_regexes(kind, count)
+            for length in args.lengths:
+                chains = make_chains(regexes, length, args.events, rand)
+                before, after = compare(regexes, chains)
+                print(
+                    f"{kind:<8} listeners {count:>4}  chars {length:>4}  "
+                    f"per-listener {before * 1e6:9.2f}us  router {after * 1e6:9.2f}us  x{before / after:.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""反复注销并重新注册命令时匹配树的节点数与内存.
+
+匹配树是否有界以及注销后能否复原由 tests/test_match_tree.py 检查.
+
+用法: python -m benchmarks.reload [--size 1000] [--rounds 20]
+"""
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from typing import Any, Callable, List, Set
+
+from graiax.shortcut.commander import CommandEntry, Commander
+from graiax.shortcut.commander._util import MatchNode
+
+from .corpus import CommandSpec, make_commands
+from .harness import arguments
+from .stub import make_commander
+
+
+def count_nodes(root: MatchNode[CommandEntry]) -> int:
+    visited: Set[int] = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) not in visited:
+            visited.add(id(node))
+            stack.extend(node.next.values())
+    return len(visited)
+
+
+def aliased(specs: List[CommandSpec]) -> List[CommandSpec]:
+    """为一部分命令加上与下一条命令首 token 冲突的别名, 以触发 MatchNode.push 的节点复制."""
+    result: List[CommandSpec] = []
+    for index, spec in enumerate(specs):
+        head, _, rest = spec.command.partition(" ")
+        if index % 3 == 0 and not head.startswith("[") and index + 1 < len(specs):
+            other = specs[index + 1].command.split(" ")[0].strip("[]").split("|")[0]
+            spec = spec._replace(command=f"[{head}|{other}] {rest}".strip())
+        result.append(spec)
+    return result
+
+
+def make_handler() -> Callable[..., None]:
+    def handler(**kwargs: Any) -> None:
+        ...
+
+    return handler
+
+
+def register(commander: Commander, specs: List[CommandSpec]) -> List[CommandEntry]:
+    handlers = {commander.command(spec.command, dict(spec.settings))(make_handler()): i for i, spec in enumerate(specs)}
+    entries: List[Any] = [None] * len(specs)
+    for entry in commander.entries:
+        if entry.callable in handlers:
+            entries[handlers[entry.callable]] = entry
+    return entries
+
+
+def unregister_all(commander: Commander) -> None:
+    for entry in list(commander.entries):
+        commander.unregister(entry)
+
+
+def main() -> None:
+    args = arguments(__doc__, size=1000, rounds=20)
+    specs = aliased(make_commands(args.size))
+    expected = count_nodes(fresh_root(specs))
+
+    tracemalloc.start()
+    commander = make_commander()
+    register(commander, specs)
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    print(f"{'round':>6}{'nodes':>10}{'entries':>10}{'mem (KiB)':>12}")
+    for index in range(1, args.rounds + 1):
+        unregister_all(commander)
+        register(commander, specs)
+        gc.collect()
+        nodes = count_nodes(commander.match_root)
+        memory = (tracemalloc.get_traced_memory()[0] - base) / 1024
+        print(f"{index:>6}{nodes:>10}{len(commander.entries):>10}{memory:>12.1f}")
+    tracemalloc.stop()
+    print(f"fresh registration: {expected} nodes")
+
+
+def fresh_root(specs: List[CommandSpec]) -> MatchNode[CommandEntry]:
+    commander = make_commander()
+    register(commander, specs)
+    return commander.match_root
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""分词引擎与逐字符实现在不同消息长度下的吞吐量.
+
+逐字符实现即 tests/reference.py 中的 `reference_split`, 两种实现的结果相同由 tests/test_split.py 检查.
+
+用法: python -m benchmarks.split [--sizes 16 256 4096 65536]
+"""
+from __future__ import annotations
+
+import random
+from typing import Callable, Dict, Iterator, List
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.commander._util import ChainContent, ChainContentList, iter_split
+from tests.reference import reference_split
+
+from .corpus import WORDS
+from .harness import arguments, timed
+
+
+def make_text(kind: str, size: int, seed: int = 0) -> MessageChain:
+    rand = random.Random(seed)
+    words: List[str] = []
+    while sum(len(word) + 1 for word in words) < size:
+        word = rand.choice(WORDS)
+        if kind == "quoted" and rand.random() < 0.3:
+            word = f'"{word} {rand.choice(WORDS)}"'
+        elif kind == "escaped" and rand.random() < 0.3:
+            word = f"{word}\\ {rand.choice(WORDS)}"
+        words.append(word)
+    return MessageChain([Text(" ".join(words)[:size])])
+
+
+def throughput(func: Callable[[MessageChain], Iterator[ChainContent]], chain: MessageChain) -> float:
+    size = len(str(chain))
+    rounds = max(1, 200_000 // max(size, 1))
+    best = min(timed(lambda: [list(func(chain)) for _ in range(rounds)]) for _ in range(3))
+    return size * rounds / best / 1e6
+
+
+def main() -> None:
+    args = arguments(__doc__, sizes=[16, 256, 4096, 65536])
+    engines: Dict[str, Callable[[MessageChain], Iterator[ChainContentList]]] = {
+        "reference": reference_split,
+        "iter_split": iter_split,
+    }
+    for kind in ("plain", "quoted", "escaped"):
+        for size in args.sizes:
+            chain = make_text(kind, size)
+            rates = {name: throughput(func, chain) for name, func in engines.items()}
+            cells = "  ".join(f"{name} {rate:7.2f}MB/s" for name, rate in rates.items())
+            print(f"{kind:<8}{size:>7}  {cells}  x{rates['iter_split'] / rates['reference']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""离线运行基准所需的桩对象."""
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from graia.broadcast.entities.exectarget import ExecTarget
+from graia.broadcast.utilles import Ctx
+
+from graiax.shortcut.commander import Commander, LRUSplitCache
+
+
+class StubBroadcast:
+    """只记录执行次数的 Broadcast 替身, 使基准只反映 Commander 自身的开销."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.loop = loop or asyncio.new_event_loop()
+        self.listeners: List[Any] = []
+        self.event_ctx: Ctx[Any] = Ctx("stub_event_ctx")
+        self.executed: int = 0
+
+    async def Executor(self, target: ExecTarget, dispatchers: Optional[List[Any]] = None) -> None:
+        self.executed += 1
+
+
+def make_commander(loop: Optional[asyncio.AbstractEventLoop] = None, **options: Any) -> Commander:
+    return Commander(
+        StubBroadcast(loop), ContextVar("benchmark_event"), split_cache=LRUSplitCache(), **options  # type: ignore
+    )
@@ -0,0 +1,106 @@
+"""Commander.suggest: 第一次调用时建立索引的耗时与内存, 以及与逐个计算编辑距离相比的查询延迟.
+
+查询为随机改动一个字符的命令首 token 与闲聊文本. 两种方式的结果相同由 tests/test_suggest.py 检查.
+
+用法: python -m benchmarks.suggest [--sizes 1000 10000] [--queries 500]
+"""
+from __future__ import annotations
+
+import gc
+import random
+import string
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from graiax.shortcut.commander import Commander
+from graiax.shortcut.commander._suggest import SuggestIndex, edit_distance
+
+from .commander import register
+from .corpus import CHAT, make_commands
+from .harness import arguments, percentiles, timed
+from .stub import make_commander
+
+
+def headers(commander: Commander) -> List[str]:
+    return sorted({header for entry in commander.entries for header in Commander._headers(entry)})
+
+
+def make_queries(words: List[str], count: int, seed: int = 0) -> List[str]:
+    rand = random.Random(seed)
+    queries: List[str] = []
+    for index in range(count):
+        if index % 2:
+            queries.append(rand.choice(CHAT).split()[0])
+            continue
+        word = list(rand.choice(words))
+        pos = rand.randrange(len(word))
+        op = rand.randrange(3)
+        if op == 0:
+            word[pos] = rand.choice(string.ascii_lowercase)
+        elif op == 1:
+            del word[pos]
+        else:
+            word.insert(pos, rand.choice(string.ascii_lowercase))
+        queries.append("".join(word))
+    return queries
+
+
+def naive(words: List[str], query: str, k: int = 3) -> List[Tuple[str, int]]:
+    limit = min(2, max((len(query) - 1) // 2, 0))
+    found = ((word, edit_distance(query, word, limit)) for word in words)
+    return sorted(((w, d) for w, d in found if d <= limit), key=lambda item: (item[1], item[0]))[:k]
+
+
+def bench(size: int, queries: int) -> None:
+    commander = make_commander()
+    total = timed(lambda: register(commander, make_commands(size)))
+    words = headers(commander)
+    build = timed(lambda: commander.suggest(""))  # the first call builds the index
+    gc.collect()
+    tracemalloc.start()
+    index = SuggestIndex(words=words)
+    memory = tracemalloc.get_traced_memory()[0]
+    del index
+    tracemalloc.stop()
+
+    indexed: List[float] = []
+    scanned: List[float] = []
+    gc.disable()
+    for query in make_queries(words, queries):
+        start = time.perf_counter()
+        commander.suggest(query)
+        indexed.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        naive(words, query)
+        scanned.append(time.perf_counter() - start)
+    gc.enable()
+
+    existing = set(commander.entries)
+
+    def churn_once() -> None:
+        register(commander, make_commands(size + 100)[size:])
+        for entry in commander.entries - existing:
+            commander.unregister(entry)
+
+    churn = timed(churn_once)
+    commander.broadcast.loop.close()
+
+    print(f"{size} commands, {len(words)} headers")
+    print(
+        f"  register {total * 1e3:8.2f}ms  first suggest (builds index) {build * 1e3:8.2f}ms  memory {memory / 2**20:6.2f}MB  "
+        f"register+unregister 100: {churn * 1e3:.2f}ms"
+    )
+    for name, samples in (("index", indexed), ("scan", scanned)):
+        p50, p90, p99 = percentiles(samples)
+        print(f"  {name:<6}p50 {p50 * 1e6:9.2f}us  p90 {p90 * 1e6:9.2f}us  p99 {p99 * 1e6:9.2f}us")
+
+
+def main() -> None:
+    args = arguments(__doc__, sizes=[1000, 10000], queries=500)
+    for size in args.sizes:
+        bench(size, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""MatchTemplate: 逐个元素检查与预编译模板 + 共用形状索引的对比.
+
+原始实现即 tests/reference.py 中的 `ReferenceTemplate`, 两者的结果相同由 tests/test_text_parser.py 检查.
+
+用法: python -m benchmarks.template [--listeners 30 300] [--events 200]
+"""
+from __future__ import annotations
+
+import random
+from typing import List
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.text_parser import MatchTemplate
+from tests.reference import At, Face, ReferenceTemplate
+
+from .corpus import CHAT, WORDS
+from .detector import per_message
+from .harness import arguments, interleaved
+
+
+def make_templates(count: int, seed: int = 0) -> List[list]:
+    """常见的形状: 纯文本命令, @ 某人后的命令, 命令后 @ 某人"""
+    rand = random.Random(seed)
+    templates: List[list] = []
+    for index in range(count):
+        word = f"{rand.choice(WORDS)}{index}"
+        templates.append(
+            [[f"/{word} *"], [At, f" {word}*"], [f"{word} ", At], [At, Text, Face]][index % 4]  # type: ignore
+        )
+    return templates
+
+
+def main() -> None:
+    args = arguments(__doc__, listeners=[30, 300], events=200)
+    rand = random.Random(1)
+    shapes = [
+        lambda: [Text(rand.choice(CHAT))],
+        lambda: [At(rand.randint(1, 9)), Text(f" {rand.choice(WORDS)}")],
+        lambda: [Text(rand.choice(CHAT)), At(1), Text(rand.choice(CHAT))],
+        lambda: [Face()],
+    ]
+    chains = [MessageChain(rand.choice(shapes)()) for _ in range(args.events)]
+    for count in args.listeners:
+        templates = make_templates(count)
+        separate = [ReferenceTemplate(template) for template in templates]
+        indexed = [MatchTemplate(template) for template in templates]
+        before, after = interleaved(lambda: per_message(separate, chains), lambda: per_message(indexed, chains))
+        print(
+            f"listeners {count:>4}  per-element {before * 1e6:9.2f}us  indexed {after * 1e6:9.2f}us  x{before / after:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
 import re
+from collections import deque
+from typing import Any, Callable, Iterable, MutableMapping, TypeVar
+from weakref import WeakKeyDictionary
 
 from graia.amnesia.message import Element, MessageChain, Text
 
+try:  # Python 3.11+
+    from re import _constants as sre_constants  # type: ignore
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:  # pragma: no cover
+    import sre_constants
+    import sre_parse
+
+T = TypeVar("T")
+
 
 def chain(elements: list[Element]) -> MessageChain:
     from graia.amnesia import message
@@ -29,6 +41,52 @@ def map_chain(chain: MessageChain) -> tuple[str, dict[str, Element]]:
     return "".join(elem_str_list), elem_mapping
 
 
+def _literal_runs(items: Iterable[tuple[Any, Any]], runs: list[str]) -> None:
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            runs[-1] += chr(av)
+        elif op is sre_constants.AT:  # zero-width, the literals around it stay adjacent
+            continue
+        elif op is sre_constants.SUBPATTERN and not av[1] & re.IGNORECASE:  # (group, add_flags, del_flags, items)
+            _literal_runs(av[3], runs)
+        elif runs[-1] or len(runs) == 1:  # the first run must stay the prefix
+            runs.append("")
+
+
+def literal_runs(pattern: re.Pattern[str]) -> list[str]:
+    """pattern 的任意匹配中必然原样出现的各段字面量.
+
+    第一段为匹配必然具有的前缀 (可能为空字符串). 忽略大小写的部分不计入, 无法确定时返回 `[""]`.
+    """
+    runs = [""]
+    if not pattern.flags & re.IGNORECASE:
+        _literal_runs(sre_parse.parse(pattern.pattern, pattern.flags), runs)
+    return runs
+
+
+def plain_text(chain: MessageChain) -> str:
+    """拼接 Text 的文本与其他元素的字符串形式"""
+    text_frags: list[str] = []
+    for elem in chain.content:
+        text_frags.append(elem.text if isinstance(elem, Text) else str(elem))
+    return "".join(text_frags)
+
+
+def text_runs(chain: MessageChain) -> tuple[str, ...]:
+    """消息链中被非文本元素分隔开的各段文本, 相邻的 Text 会被合并"""
+    runs: list[str] = []
+    texts: list[str] = []
+    for elem in chain.content:
+        if isinstance(elem, Text):
+            texts.append(elem.text)
+        elif texts:
+            runs.append("".join(texts))
+            texts.clear()
+    if texts:
+        runs.append("".join(texts))
+    return tuple(runs)
+
+
 __element_pattern = re.compile("(\x02\\w+\x03)")
 
 
@@ -44,3 +102,156 @@ def unmap_chain(string: str, mapping: dict[str, Element]) -> MessageChain:
             else:
                 elements.append(text(x))
     return chain(elements)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 自动机, 一次扫描即可找出文本中出现的所有已注册关键字.
+
+    增删关键字只标记自动机过期, 在下一次查询时重建. 最近查询过的文本的结果会被缓存.
+    """
+
+    __slots__ = ("counts", "goto", "fail", "output", "stale", "cache", "cache_size")
+
+    counts: dict[str, int]
+    goto: list[dict[str, int]]
+    fail: list[int]
+    output: list[frozenset[str]]
+    stale: bool
+    cache: dict[tuple[str, ...], frozenset[str]]
+    cache_size: int
+
+    def __init__(self, cache_size: int = 64) -> None:
+        self.counts = {}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [frozenset()]
+        self.stale = False
+        self.cache = {}
+        self.cache_size = cache_size
+
+    def add(self, keyword: str) -> None:
+        count = self.counts.get(keyword, 0)
+        self.counts[keyword] = count + 1
+        if not count:
+            self.stale = True
+
+    def remove(self, keyword: str) -> None:
+        if (count := self.counts.get(keyword, 0)) > 1:
+            self.counts[keyword] = count - 1
+        elif count:
+            del self.counts[keyword]
+            self.stale = True
+
+    def discard(self, keywords: Iterable[str]) -> None:
+        for keyword in keywords:
+            self.remove(keyword)
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.counts
+
+    def build(self) -> None:
+        goto: list[dict[str, int]] = [{}]
+        output: list[set[str]] = [set()]
+        for keyword in self.counts:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                if (target := goto[state].get(char)) is None:
+                    target = goto[state][char] = len(goto)
+                    goto.append({})
+                    output.append(set())
+                state = target
+            output[state].add(keyword)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:  # breadth first, so the fail state of a parent is always ready
+            state = queue.popleft()
+            for char, target in goto[state].items():
+                queue.append(target)
+                back = fail[state]
+                while back and char not in goto[back]:
+                    back = fail[back]
+                fail[target] = goto[back].get(char, 0)
+                output[target] |= output[fail[target]]
+        self.goto, self.fail, self.output = goto, fail, [frozenset(found) for found in output]
+        self.stale = False
+        self.cache.clear()
+
+    def search(self, texts: tuple[str, ...]) -> frozenset[str]:
+        """在每段文本中分别查找, 关键字不会跨越两段文本
+
+        Args:
+            texts (tuple[str, ...]): 文本
+
+        Returns:
+            frozenset[str]: 出现过的关键字 (不包括空字符串)
+        """
+        if self.stale:
+            self.build()
+        if (found := self.cache.get(texts)) is not None:
+            return found
+        goto, fail, output = self.goto, self.fail, self.output
+        keywords: set[str] = set()
+        for text in texts:
+            state = 0
+            for char in text:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                if output[state]:
+                    keywords |= output[state]
+        if len(self.cache) >= self.cache_size:
+            del self.cache[next(iter(self.cache))]
+        found = self.cache[texts] = frozenset(keywords)
+        return found
+
+
+def content_snapshot(chain: MessageChain) -> list[str | Element]:
+    """用于判断消息链是否被原地修改: Text 取其文本, 其他元素取元素本身"""
+    return [elem.text if isinstance(elem, Text) else elem for elem in chain.content]
+
+
+class DerivedCache:
+    """同一条消息的派生数据 (字符串形式, 分词结果等) 的缓存, 供处理这条消息的所有监听器共用.
+
+    以消息链对象为弱引用键, 消息链被回收时其派生数据随之释放, 因此缓存的生命周期与消息相同.
+    每次查询都会比对消息内容, 增减, 替换元素或修改 Text 的文本 (如 `removeprefix(copy=False)`) 后重新计算;
+    非 Text 元素只与自身比较, 被原地修改时仍会使用修改前的结果.
+    """
+
+    __slots__ = ("data",)
+
+    data: MutableMapping[MessageChain, tuple[list[str | Element], dict[Any, Any]]]
+
+    def __init__(self) -> None:
+        self.data = WeakKeyDictionary()
+
+    def get(self, chain: MessageChain, factory: Callable[[MessageChain], T]) -> T:
+        """获取 `factory(chain)`, 同一条消息只计算一次
+
+        Args:
+            chain (MessageChain): 消息链
+            factory (Callable[[MessageChain], T]): 派生函数, 同时作为缓存的键; 不应修改消息链, 结果不应引用消息链
+
+        Returns:
+            T: 派生数据, 多个监听器共用同一对象, 不应被修改
+        """
+        snapshot = content_snapshot(chain)
+        if (cached := self.data.get(chain)) is None or cached[0] != snapshot:
+            cached = self.data[chain] = (snapshot, {})
+        derived = cached[1]
+        if factory in derived:
+            return derived[factory]
+        result = derived[factory] = factory(chain)
+        return result
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+derived_cache: DerivedCache = DerivedCache()
+"""text_parser 中的消息处理器与 Commander 共用的消息派生数据缓存"""
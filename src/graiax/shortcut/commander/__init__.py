@@ -4,13 +4,17 @@ from __future__ import annotations
 import abc
 import asyncio
 import contextlib
-import copy
+import functools
 import inspect
-from contextvars import ContextVar
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass
+from time import perf_counter
 from typing import (
     TYPE_CHECKING,
     Any,
+    Awaitable,
     Callable,
+    Container,
     Deque,
     Dict,
     FrozenSet,
@@ -18,7 +22,6 @@ from typing import (
     Iterable,
     List,
     Literal,
-    NamedTuple,
     Optional,
     Sequence,
     Set,
@@ -40,34 +43,70 @@ from graia.broadcast.typing import T_Dispatcher
 
 # TODO: Decouple from PyDantic
 from pydantic import BaseConfig, BaseModel
-from pydantic.class_validators import Validator
+from pydantic.class_validators import Validator, make_generic_validator
 from pydantic.fields import ModelField
 from typing_extensions import Self
 
 from .._typing_util import MaybeFlag, Sentinel
+from .._util import derived_cache
+from ._convert import Converter, compile_converter
+from ._explain import CandidateTrace, MatchTrace, StepTrace
+from ._limit import ConcurrencyLimit
+from ._profile import CommandProfiler, EntryReport, EntryStats
+from ._suggest import SuggestIndex
 from ._util import (
+    EMPTY_MAPPING,
+    EMPTY_SET,
     AnnotatedParam,
     ChainContent,
     ChainContentList,
     ContextVarDispatcher,
+    InContext,
+    LazySplit,
+    LRUSplitCache,
+    MatchAutomaton,
     MatchEntry,
     MatchNode,
     ParamFrag,
+    SplitCache,
     TextFrag,
+    WeakSplitCache,
     const_fn,
     convert_empty,
     extract_str,
     gen_subclass,
     graia_affiliated,
+    intern_choice,
+    iter_split,
     raw,
+    reach,
     resolve_dispatchers_mixin,
-    split,
-    tokenize,
 )
+from ._util import split_cache as default_split_cache
+from ._util import tokenize
 
 T_Callable = TypeVar("T_Callable", bound=Callable)
 
 
+def _convert_chain(value: Any, outer_type: Any, get_default: Callable[[], Any]) -> Any:
+    if not isinstance(value, list):
+        return get_default() if value is None else value
+    if not value:
+        return get_default()
+    if issubclass(outer_type, MessageChain):
+        return _msg_(list(value))  # the split may be shared by other messages
+    if isinstance(outer_type, type) and issubclass(outer_type, Element):
+        assert len(value) == 1
+        v = value[0]
+        if issubclass(outer_type, Text):
+            assert v.__class__ is str
+            return _text_(v)
+        assert v.__class__ is outer_type
+        return v
+    value = _msg_(list(value))
+    return str(value) if outer_type in (bool, str, int) else value
+
+
 def chain_validator(value: Any, field: ModelField) -> Any:
     """MessageChain 处理函数.
 
@@ -78,22 +117,7 @@ def chain_validator(value: Any, field: ModelField) -> Any:
         value (Any): 验证值
         field (ModelField): 当前的 model 字段
     """
-    if not isinstance(value, list):
-        return field.get_default() if value is None else value
-    if not value:
-        return field.get_default()
-    if issubclass(field.outer_type_, MessageChain):
-        return _msg_(value)
-    if isinstance(field.outer_type_, type) and issubclass(field.outer_type_, Element):
-        assert len(value) == 1
-        v = value[0]
-        if issubclass(field.outer_type_, Text):
-            assert v.__class__ is str
-            return _text_(v)
-        assert v.__class__ is field.outer_type_
-        return v
-    value = _msg_(value)
-    return str(value) if field.outer_type_ in (bool, str, int) else value
+    return _convert_chain(value, field.outer_type_, field.get_default)
 
 
 def wildcard_validator(value: ChainContentList, field: ModelField) -> Any:
@@ -108,29 +132,38 @@ def wildcard_validator(value: ChainContentList, field: ModelField) -> Any:
                 for content in value
             ]
         )
-    altered_field = copy.copy(field)
-    altered_field.outer_type_ = field.type_
-    return [chain_validator(v, altered_field) for v in value] or field.get_default() or []
+    return [_convert_chain(v, field.type_, field.get_default) for v in value] or field.get_default() or []
 
 
 class ParamDesc(abc.ABC):
+    __slots__ = ("field", "converter", "dest")
     field: ModelField
+    converter: Converter
     dest: str
 
+    def prepare(self) -> None:
+        """在注册时确定类型等信息, 不生成 ModelField."""
+
     @abc.abstractmethod
+    def build_field(self, validators: List[Callable]) -> None:
+        """生成 ParamDesc 上的 ModelField 与转换函数, 需先调用 `prepare`.
+
+        Args:
+            validators (List[Callable]): 用作 validator 的 Callable 列表
+        """
+        ...
+
     def populate_field(self, validators: Iterable[Callable]) -> None:
         """生成 ParamDesc 上的 ModelField.
 
         Args:
             validators (Iterable[Callable]): 用作 validator 的 Callable 可迭代对象
         """
-        ...
+        self.prepare()
+        self.build_field(list(validators))
 
     def validate(self, v: Any) -> Any:
-        res, err = self.field.validate(v, {self.field.name: v}, loc=self.dest)
-        if err:
-            raise ValueError(err)
-        return res
+        return self.converter(v)
 
 
 class _CommanderModelConfig(BaseConfig):
@@ -138,6 +171,23 @@ class _CommanderModelConfig(BaseConfig):
     arbitrary_types_allowed: bool = True
 
 
+_builtin_validators: Dict[Callable, Validator] = {
+    validator: Validator(validator, pre=True, always=True) for validator in (chain_validator, wildcard_validator)
+}
+"""模块自带的 validator 在所有字段间共用; 用户的 validator 可能不可哈希, 也不应被模块一直持有, 每个字段各自生成"""
+
+
+@functools.lru_cache(maxsize=None)
+def _validator_name(index: int) -> str:
+    return f"#commander_validator_{index}#"
+
+
+def _class_validator(index: int, validator: Callable) -> Tuple[str, Validator]:
+    if validator is chain_validator or validator is wildcard_validator:
+        return _validator_name(index), _builtin_validators[validator]
+    return _validator_name(index), Validator(validator, pre=True, always=True)
+
+
 def _make_field(
     name: str,
     type: Type,
@@ -149,9 +199,7 @@ def _make_field(
         name=name,
         type_=type,
         model_config=_CommanderModelConfig,
-        class_validators={
-            f"#commander_validator_{i}#": Validator(v, pre=True, always=True) for i, v in enumerate(validators)
-        },
+        class_validators=dict(_class_validator(i, v) for i, v in enumerate(validators)),
         default_factory=new_factory,
         required=new_factory is None,
     )
@@ -160,6 +208,8 @@ def _make_field(
 class Slot(ParamDesc):
     """Slot"""
 
+    __slots__ = ("target", "type", "is_optional", "is_wildcard", "default_factory")
+
     def __init__(
         self,
         target: Union[str, int],
@@ -185,18 +235,28 @@ class Slot(ParamDesc):
             const_fn(default) if default is not Sentinel else default_factory
         )
 
-    def populate_field(self, validators: Iterable[Callable]) -> None:
+    def prepare(self) -> None:
         if self.type is Sentinel:
             self.type = MessageChain if self.default_factory is Sentinel else self.default_factory().__class__
         if self.is_wildcard and self.type is not raw and not TYPE_CHECKING:
             self.type = List[self.type]
         self.is_optional = self.is_wildcard or (self.default_factory is not Sentinel)
+
+    def build_field(self, validators: List[Callable]) -> None:
         self.field = _make_field(
             self.target,
             self.type,
             self.default_factory,
             validators,
         )
+        self.converter = compile_converter(
+            self.field,
+            self.dest,
+            self.type,
+            self.default_factory,
+            self.is_wildcard,
+            bool(validators) and validators[0] is (wildcard_validator if self.is_wildcard else chain_validator),
+        )
 
     def merge(self, other: Self) -> Self:
         if self.type is Sentinel and other.type is not Sentinel:
@@ -220,6 +280,8 @@ class Slot(ParamDesc):
 class Arg(ParamDesc):
     """Argument"""
 
+    __slots__ = ("type", "tags", "headers", "default_factory")
+
     headers: FrozenSet[str]
 
     def __init__(
@@ -260,11 +322,20 @@ class Arg(ParamDesc):
         if type is not Sentinel:
             self.type = type
 
-    def populate_field(self, validators: Iterable[Callable]) -> None:
+    def prepare(self) -> None:
         assert self.dest
         assert self.type is not Sentinel, f"{self} don't have an appropriate type!"
         assert self.default_factory is not Sentinel, f"{self} doesn't have default value!"
+
+    def build_field(self, validators: List[Callable]) -> None:
         self.field = _make_field(self.dest, self.type, Sentinel, validators)
+        self.converter = compile_converter(
+            self.field,
+            self.dest,
+            self.type,
+            Sentinel,
+            builtin=bool(validators) and validators[0] is chain_validator,
+        )
 
     def update(self, annotation: MaybeFlag[Any], default: MaybeFlag[Any]) -> None:
         if self.type is Sentinel and annotation is not Sentinel:
@@ -290,21 +361,51 @@ class CommandEntry(MatchEntry, ExecTarget):
         self._slot_targets: Optional[Tuple[FrozenSet[str], ...]] = None
         self.optional: List[Slot] = []
         self.wildcard: Optional[Slot] = None
+        self.limit: Optional[ConcurrencyLimit] = None
+        self._pending_fields: Optional[List[Tuple[ParamDesc, List[Callable]]]] = None
+        self.propagation: Propagation = "wait"
+        self.stats: Optional[EntryStats] = None
+        """`Commander.profiler` 记录到的统计, 在注册或设置 profiler 时分配"""
 
     @property
     def arg_name_map(self) -> Dict[Arg, str]:
-        if not self._arg_name_map:
+        if self._arg_name_map is None:
             self._arg_name_map = {v: k for k, v in self.arg_map.items()}
         return self._arg_name_map
 
     @property
     def slot_targets(self) -> Tuple[FrozenSet[str], ...]:
-        if not self._slot_targets:
+        if self._slot_targets is None:
             self._slot_targets = tuple(
                 frozenset(name for name in param.names if name in self.slot_map) for param in self.params
             )
         return self._slot_targets
 
+    def compact(self) -> None:
+        """注册完成后压缩 entry 的内存占用: 空容器换为共享的只读对象, 列表换为元组"""
+        self.slot_map = self.slot_map or EMPTY_MAPPING  # type: ignore
+        self.arg_map = self.arg_map or EMPTY_MAPPING  # type: ignore
+        self.header_map = self.header_map or EMPTY_MAPPING  # type: ignore
+        self.targets = intern_choice(self.targets)  # type: ignore
+        self._arg_name_map = {v: k for k, v in self.arg_map.items()} or EMPTY_MAPPING  # type: ignore
+        self.optional = tuple(self.optional)  # type: ignore
+        self.nodes = tuple(self.nodes)  # type: ignore
+        self.tokens = tuple(self.tokens)  # type: ignore
+        self.params = tuple(self.params)  # type: ignore
+
+    @property
+    def populated(self) -> bool:
+        """参数的 ModelField 是否已经生成"""
+        return self._pending_fields is None
+
+    def populate(self) -> None:
+        """生成延迟的 ModelField 与转换函数, 已生成时不做任何事"""
+        if self._pending_fields is None:
+            return
+        for param, validators in self._pending_fields:
+            param.build_field(validators)
+        self._pending_fields = None
+
     def update_from_func(self) -> None:
         """从 ExecTarget.callable 更新 entry 的信息"""
         for name, parameter in inspect.signature(self.callable).parameters.items():
@@ -336,7 +437,7 @@ class CommandEntry(MatchEntry, ExecTarget):
                 ):
                     value = dict(zip(arg.tags, arg_data[arg.dest]))
                 elif len(arg.tags):
-                    value = arg_data[arg.dest]
+                    value = arg_data[arg.dest][0]
                 else:  # probably a bool, flip it
                     value = not value
             compile_result[arg.dest] = arg.validate(value)
@@ -353,6 +454,8 @@ class CommandEntry(MatchEntry, ExecTarget):
         arg_data: Dict[str, ChainContentList],  # Arg.dest -> List[ChainContent]
         extras: ChainContentList,
     ) -> Dict[str, Any]:
+        if self._pending_fields is not None:
+            self.populate()
         compile_result: Dict[str, Any] = {
             slot.dest: slot.validate(slot_data[target]) for target, slot in self.slot_map.items()
         }
@@ -361,16 +464,178 @@ class CommandEntry(MatchEntry, ExecTarget):
         return compile_result
 
 
-class ParseData(NamedTuple):
-    index: int
-    node: MatchNode[CommandEntry]
-    params: Tuple[ChainContent, ...]
+def _assign_args(
+    frags: Sequence[ChainContent], index: int, entry: CommandEntry
+) -> Optional[Tuple[Dict[str, ChainContentList], ChainContentList]]:
+    """逐个扫描 index 之后的 token, 按 entry 的 Arg 切分, 结果与 `TailIndex.assign` 相同"""
+    extras: ChainContentList = []
+    arg_data: Dict[str, ChainContentList] = {}
+    while index < len(frags):
+        frag: ChainContent = frags[index]
+        if (str_frag := extract_str(frag)) in entry.header_map:
+            arg = entry.header_map[str_frag]
+            index += 1
+            if arg.dest:
+                if arg.dest in arg_data:  # if the arg is already assigned
+                    return None
+                arg_data[arg.dest] = frags[index : index + len(arg.tags)]
+            index += len(arg.tags)
+            if index > len(frags):  # failed
+                return None
+            continue
+        else:
+            extras.append(frags[index])
+            index += 1
+    return arg_data, extras
+
+
+class TailIndex:
+    """`match` 中到达同一状态的多个 entry 共用的剩余 token 与 Arg 头位置索引, 均在第一次使用时建立.
+
+    剩余 token 只扫描一次, 之后每个 entry 只需遍历其中的 Arg 头,
+    开销取决于消息长度与 Arg 头的数量, 而非消息长度 × entry 数量.
+    """
+
+    __slots__ = ("frags", "start", "names", "_rest", "_headers", "_slot_data")
+
+    def __init__(self, frags: Sequence[ChainContent], start: int, names: Container[str]) -> None:
+        """
+        Args:
+            frags (Sequence[ChainContent]): 分词结果
+            start (int): 剩余 token 的起始下标
+            names (Container[str]): 共用此索引的 entry 的所有 Arg 头
+        """
+        self.frags: Sequence[ChainContent] = frags
+        self.start: int = start
+        self.names: Container[str] = names
+        self._rest: Optional[ChainContentList] = None
+        self._headers: Optional[List[Tuple[int, str]]] = None
+        self._slot_data: Dict[Tuple[FrozenSet[str], ...], Dict[str, ChainContent]] = {}
+
+    @property
+    def rest(self) -> ChainContentList:
+        """剩余 token"""
+        if self._rest is None:
+            self._rest = list(self.frags[self.start :])
+        return self._rest
+
+    @property
+    def headers(self) -> List[Tuple[int, str]]:
+        """`rest` 中的 (位置, Arg 头), 按位置排列"""
+        if self._headers is None:
+            names = self.names
+            self._headers = [
+                (offset, str_frag) for offset, frag in enumerate(self.rest) if (str_frag := extract_str(frag)) in names
+            ]
+        return self._headers
+
+    def slot_data(self, entry: CommandEntry, params: Tuple[ChainContent, ...]) -> Dict[str, ChainContent]:
+        """Slot.target -> ChainContent, Slot 名称相同的 entry 共用同一个 dict"""
+        if (data := self._slot_data.get(targets := entry.slot_targets)) is None:
+            data = self._slot_data[targets] = {name: chain for names, chain in zip(targets, params) for name in names}
+        return data
+
+    def assign(self, entry: CommandEntry) -> Optional[Tuple[Dict[str, ChainContentList], ChainContentList]]:
+        """按 entry 的 Arg 切分剩余 token.
+
+        Returns:
+            Optional[Tuple[Dict[str, ChainContentList], ChainContentList]]: Arg.dest -> 参数, 以及其余 token. \
+                Arg 重复出现或参数不足时为 None.
+        """
+        rest = self.rest
+        if not (header_map := entry.header_map):
+            return {}, rest[:]
+        arg_data: Dict[str, ChainContentList] = {}
+        extras: ChainContentList = []
+        cursor = 0
+        for offset, header in self.headers:
+            if offset < cursor or (arg := header_map.get(header)) is None:
+                continue  # consumed as a tag of the previous Arg, or an Arg of another entry
+            extras.extend(rest[cursor:offset])
+            cursor = offset + 1 + len(arg.tags)
+            if arg.dest:
+                if arg.dest in arg_data:  # if the arg is already assigned
+                    return None
+                arg_data[arg.dest] = rest[offset + 1 : cursor]
+            if cursor > len(rest):  # failed
+                return None
+        extras.extend(rest[cursor:])
+        return arg_data, extras
+
+
+@dataclass
+class MatchStats:
+    """Commander 的消息计数"""
+
+    rejected: int = 0
+    """首个 token 无法开始任何命令, 被直接拒绝的消息数"""
+
+    walked: int = 0
+    """进入匹配树查找的消息数"""
 
 
 commander_param_ctx = ContextVar("commander_param_ctx")
 
 param_dispatcher = ContextVarDispatcher(commander_param_ctx)
 
+propagation_ctx: ContextVar[asyncio.Future[bool]] = ContextVar("propagation_ctx")
+
+Propagation = Literal["wait", "early", "continue"]
+
+
+def resolve_propagation(stop: bool = False) -> None:
+    """在 `propagation="early"` 的命令处理函数中提前决定是否取消事件传播.
+
+    决定后低优先级的命令即可开始执行, 之后抛出的 `PropagationCancelled` 不再生效.
+
+    Args:
+        stop (bool, optional): 是否取消事件传播
+    """
+    if (decision := propagation_ctx.get(None)) is not None and not decision.done():
+        decision.set_result(stop)
+
+
+async def _propagate(decision: asyncio.Future[bool], awaitable: Awaitable[Any]) -> None:
+    propagation_ctx.set(decision)  # only visible inside this task
+    try:
+        await awaitable
+    except PropagationCancelled:
+        if not decision.done():
+            decision.set_result(True)
+    finally:
+        if not decision.done():
+            decision.set_result(False)
+
+
+def _failed_param(
+    entry: CommandEntry,
+    slot_data: Dict[str, ChainContent],
+    arg_data: Dict[str, ChainContentList],
+    extras: ChainContentList,
+) -> str:
+    # validate one by one to find the parameter which raised
+    for target, slot in entry.slot_map.items():
+        with contextlib.suppress(ValueError):
+            slot.validate(slot_data[target])
+            continue
+        return slot.dest
+    with contextlib.suppress(ValueError):
+        entry.compile_arg({}, arg_data)
+        return "optional / wildcard"
+    return "Args"
+
+
+def _cancel(tasks: Iterable[asyncio.Task]) -> None:
+    # dispatch is being cancelled, so are the handlers it would have waited for
+    for task in tasks:
+        task.cancel()
+
+
+def _stops_propagation(decision: asyncio.Future) -> bool:
+    if isinstance(decision, asyncio.Task):
+        return isinstance(decision.exception(), PropagationCancelled)
+    return decision.result()
+
 
 T_Event = TypeVar("T_Event", bound=Dispatchable)
 
@@ -378,19 +643,49 @@ T_Event = TypeVar("T_Event", bound=Dispatchable)
 class Commander(Generic[T_Event]):
     """便利的指令触发体系"""
 
-    def __init__(self, broadcast: Broadcast, event_ctx: ContextVar[T_Event], listen: Type[T_Event] | None = None):
+    def __init__(
+        self,
+        broadcast: Broadcast,
+        event_ctx: ContextVar[T_Event],
+        listen: Type[T_Event] | None = None,
+        *,
+        inline: bool = True,
+        split_cache: Optional[SplitCache] = None,
+        profiler: Optional[CommandProfiler] = None,
+        lazy_fields: bool = False,
+    ):
         """
         Args:
             broadcast (Broadcast): 事件系统
             listen (bool): 是否监听消息事件
+            inline (bool, optional): 某一优先级只有一个命令匹配, 且更高优先级没有仍在执行的 `"early"` 或 `"continue"` 命令时, \
+                是否直接在当前任务中执行而不创建 Task. \
+                处理函数仍在上下文的副本中执行, 对 ContextVar 的修改不会影响其他命令与调用者; \
+                区别在于 `asyncio.current_task()` 为调用者的任务, 调用者被取消时处理函数也会被取消.
+            split_cache (SplitCache, optional): 分词缓存, 默认与其他 Commander 共用同一个 LRUSplitCache.
+            profiler (CommandProfiler, optional): 按命令的计数与采样计时, 默认不启用.
+            lazy_fields (bool, optional): 是否将 ModelField 的生成推迟到命令第一次匹配成功时, \
+                可配合 `prewarm` 在启动后生成. 参数类型与 type caster 仍在注册时检查, 每种类型只检查一次.
         """
         self.broadcast = broadcast
+        self.inline: bool = inline
+        self.split_cache: SplitCache = split_cache if split_cache is not None else default_split_cache
         self._slot_validators: List[Callable] = [chain_validator]
         self._wildcard_validators: List[Callable] = [wildcard_validator]
         self._arg_validators: List[Callable] = [chain_validator]
         self.match_root: MatchNode[CommandEntry] = MatchNode()
+        self._automaton: Optional[MatchAutomaton[CommandEntry]] = None
+        self._arg_headers: List[FrozenSet[str]] = []
+        """每个状态上所有 entry 的 Arg 头, 与 `_automaton` 一同建立"""
         self.entries: Set[CommandEntry] = set()
         self.event_ctx: ContextVar[T_Event] = event_ctx
+        self.stats: MatchStats = MatchStats()
+        self._profiler: Optional[CommandProfiler] = profiler
+        self.lazy_fields: bool = lazy_fields
+        self._checked_types: Set[Any] = set()
+        self._dispatcher_cache: Dict[type, List[T_Dispatcher]] = {}
+        self._suggest_index: Optional[SuggestIndex] = None
+        """`suggest` 使用的近似查找索引, 第一次调用 `suggest` 时建立, 之后随注册与注销增量更新"""
 
         if listen is not None:
             self.broadcast.listeners.append(
@@ -401,6 +696,18 @@ class Commander(Generic[T_Event]):
                 )
             )
 
+    @property
+    def profiler(self) -> Optional[CommandProfiler]:
+        """按命令的计数与采样计时, 设置时为已注册的命令分配统计"""
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler: Optional[CommandProfiler]) -> None:
+        if profiler:
+            for entry in self.entries:
+                profiler.stats(entry)
+        self._profiler = profiler
+
     def __del__(self):
         self.broadcast.listeners = [i for i in self.broadcast.listeners if i.callable != self.execute]
 
@@ -414,8 +721,19 @@ class Commander(Generic[T_Event]):
         """
         assert type in ("slot", "wildcard", "arg")
         validators: List[Callable] = getattr(self, f"_{type}_validators")
+        for validator in caster:
+            make_generic_validator(validator)  # report a bad signature now instead of at the next registration
         validators.extend(caster)
 
+    def _check_type(self, type_: Any) -> None:
+        """检查 type_ 能否生成 ModelField, 供 `lazy_fields` 在注册时报告类型错误; 已检查的类型会被记住"""
+        with contextlib.suppress(TypeError):  # unhashable annotations are simply checked every time
+            if type_ in self._checked_types:
+                return
+        _make_field("#commander_check#", type_, Sentinel)
+        with contextlib.suppress(TypeError):
+            self._checked_types.add(type_)
+
     @staticmethod
     def parse_command(command: str, entry: CommandEntry, nbsp: dict[str, Any]) -> None:
         """从传入的命令补充 entry 的信息
@@ -472,6 +790,8 @@ class Commander(Generic[T_Event]):
         priority: int = 16,
         *,
         nbsp: Optional[dict[str, Any]] = None,
+        limit: Optional[ConcurrencyLimit] = None,
+        propagation: Propagation = "wait",
     ) -> Callable[[T_Callable], T_Callable]:
         """装饰一个命令处理函数
 
@@ -481,6 +801,9 @@ class Commander(Generic[T_Event]):
             dispatchers (Sequence[T_Dispatcher], optional): 可选的额外 Dispatcher 序列.
             decorators (Sequence[Decorator], optional): 可选的额外 Decorator 序列.
             nbsp (dict[str, Any], optional): 可选的字符串评估命名空间.
+            limit (ConcurrencyLimit, optional): 可选的并发限制, 可由多个命令共用.
+            propagation (Literal["wait", "early", "continue"], optional): 低优先级命令何时开始执行: \
+                处理函数执行完毕, 调用 `resolve_propagation` 或立即开始. 默认为执行完毕.
         Raises:
             ValueError: 命令格式错误
 
@@ -489,7 +812,12 @@ class Commander(Generic[T_Event]):
         """
 
         entry = CommandEntry(priority)
+        entry.limit = limit
+        assert propagation in ("wait", "early", "continue"), f"Unknown propagation: {propagation!r}"
+        entry.propagation = propagation
         self.entries.add(entry)  # Add strong ref
+        if self._profiler:
+            self._profiler.stats(entry)
 
         for name, val in (settings or {}).items():
             if isinstance(val, Slot):
@@ -522,105 +850,481 @@ class Commander(Generic[T_Event]):
                             entry.optional.append(slot)
                             break
 
-            # populate fields
-            for slot in entry.slot_map.values():
-                slot.populate_field(self._wildcard_validators if slot.is_wildcard else self._slot_validators)
-            for arg in entry.arg_map.values():
-                arg.populate_field(self._arg_validators)
+            # populate fields, validators are captured now so later type casts do not apply
+            entry._pending_fields = [
+                *(
+                    (slot, list(self._wildcard_validators if slot.is_wildcard else self._slot_validators))
+                    for slot in entry.slot_map.values()
+                ),
+                *((arg, list(self._arg_validators)) for arg in entry.arg_map.values()),
+            ]
+            for param, _ in entry._pending_fields:
+                param.prepare()
+                if self.lazy_fields:
+                    self._check_type(param.type)  # type: ignore
+            if not self.lazy_fields:
+                entry.populate()
             for optional_key in [k for k, v in entry.slot_map.items() if v.is_optional]:
                 entry.slot_map.pop(optional_key)
             for _ in entry.optional:
                 entry.nodes.pop()
             if entry.wildcard:
                 entry.nodes.pop()  # the last optional / wildcard token should not be on the MatchGraph
+            entry.compact()
             self.match_root.push(entry)
+            self._automaton = None
+            if self._suggest_index is not None:
+                for header in self._headers(entry):
+                    self._suggest_index.add(header)
             return func
 
         return wrapper
 
+    async def prewarm(self, batch: int = 16) -> int:
+        """逐步生成 `lazy_fields` 推迟的 ModelField, 每生成 batch 个命令让出一次事件循环.
+
+        Example:
+            >>> broadcast.loop.create_task(commander.prewarm())
+
+        Args:
+            batch (int, optional): 每批生成的命令数
+
+        Returns:
+            int: 本次生成的命令数
+        """
+        count = 0
+        for entry in list(self.entries):
+            if entry.populated:
+                continue
+            entry.populate()
+            count += 1
+            if count % batch == 0:
+                await asyncio.sleep(0)
+        return count
+
+    def unregister(self, entry: CommandEntry) -> None:
+        """注销命令, 并从匹配树中移除其节点.
+
+        Args:
+            entry (CommandEntry): 要注销的命令
+        """
+        self.entries.discard(entry)
+        self.match_root.remove(entry)
+        self._automaton = None
+        if self._suggest_index is not None:
+            for header in self._headers(entry):
+                self._suggest_index.remove(header)
+
+    @staticmethod
+    def _headers(entry: CommandEntry) -> FrozenSet[str]:
+        """entry 的首 token 的所有字面量, 以 Slot 开头时为空"""
+        return entry.nodes[0] if entry.nodes and entry.nodes[0] is not Sentinel else frozenset()
+
+    def suggest(
+        self, query: Union[str, MessageChain], k: int = 3, max_distance: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """查找与 query 的首 token 最接近的命令首 token, 可用于 "您是否想输入 ..." 提示.
+
+        第一次调用时建立近似查找索引 (每个命令首 token 约占 4KB 内存), 之后索引随命令的注册与注销增量更新.
+
+        Example:
+            >>> if not commander.accept(chain) and (found := commander.suggest(chain, k=1)):
+            ...     await reply(f"您是否想输入 {found[0][0]}?")
+
+        Args:
+            query (Union[str, MessageChain]): 查询词或消息链
+            k (int, optional): 返回的数量
+            max_distance (int, optional): 最大编辑距离, 默认为 2, 较短的查询词会进一步收紧
+
+        Returns:
+            List[Tuple[str, int]]: (命令首 token, 编辑距离), 按距离与字典序排列
+        """
+        if self._suggest_index is None:
+            self._suggest_index = SuggestIndex(
+                words=(header for entry in self.entries for header in self._headers(entry))
+            )
+        if isinstance(query, MessageChain):
+            if (frag := self.split_cache.first(query)) is None or (text := extract_str(frag)) is None:
+                return []
+            query = text
+        return self._suggest_index.query(query, k, max_distance)
+
+    def freeze(self) -> MatchAutomaton[CommandEntry]:
+        """将 `match_root` 编译为 `MatchAutomaton` 状态表.
+
+        `match` 会自动调用此方法, 注册或注销命令后状态表会在下次匹配时重新编译.
+
+        Returns:
+            MatchAutomaton[CommandEntry]: 编译后的状态表
+        """
+        if self._automaton is None:
+            self._automaton = MatchAutomaton(self.match_root)
+            self._arg_headers = [
+                frozenset().union(*(entry.header_map for entry in entries)) if entries else EMPTY_SET
+                for entries in self._automaton.entries
+            ]
+        return self._automaton
+
     def parse_rest(
         self,
         index: int,
-        frags: ChainContentList,
+        frags: Sequence[ChainContent],
         params: Tuple[ChainContent, ...],
         entry: CommandEntry,
+        tail: Optional[TailIndex] = None,
     ) -> Optional[Tuple[CommandEntry, dict]]:
-        # walks down optional, wildcard and Arg
-        # extract slot data based on entry
-        slot_data: Dict[str, ChainContent] = {
-            name: chain for targets, chain in zip(entry.slot_targets, params) for name in targets
-        }
-        # slam all the rest data inside extra_list
-        extras: ChainContentList = []
-        arg_data: Dict[str, ChainContentList] = {}
-        # index frags
-        while index < len(frags):
-            frag: ChainContent = frags[index]
-            if (str_frag := extract_str(frag)) in entry.header_map:
-                arg = entry.header_map[str_frag]
-                index += 1
-                if arg.dest:
-                    if arg.dest in arg_data:  # if the arg is already assigned
-                        return
-                    arg_data[arg.dest] = frags[index : index + len(arg.tags)]
-                index += len(arg.tags)
-                if index > len(frags):  # failed
-                    return None
-                continue
-            else:
-                extras.append(frags[index])
-                index += 1
+        if (scanned := self.scan_rest(index, frags, params, entry, tail)) is None:
+            return None
+        return entry, entry.compile_param(*scanned)
+
+    def scan_rest(
+        self,
+        index: int,
+        frags: Sequence[ChainContent],
+        params: Tuple[ChainContent, ...],
+        entry: CommandEntry,
+        tail: Optional[TailIndex] = None,
+    ) -> Optional[Tuple[Dict[str, ChainContent], Dict[str, ChainContentList], ChainContentList]]:
+        """将 index 之后的 token 分配给 entry 的 Arg, 可选 Slot 与 wildcard.
+
+        Args:
+            index (int): 剩余 token 的起始下标
+            frags (Sequence[ChainContent]): 分词结果
+            params (Tuple[ChainContent, ...]): 匹配路径上被 Slot 消耗的 token
+            entry (CommandEntry): 要匹配的命令
+            tail (TailIndex, optional): 同一状态上的多个 entry 共用的剩余 token 索引, 默认逐个扫描剩余 token
+
+        Returns:
+            Optional[Tuple[Dict[str, ChainContent], Dict[str, ChainContentList], ChainContentList]]: \
+                `CommandEntry.compile_param` 的参数, 剩余 token 无法分配时为 None
+        """
+        if not entry.header_map and not entry.wildcard and reach(frags, index + len(entry.optional)):
+            return None  # more tokens than optional slots, no need to split the rest
+        if (assigned := _assign_args(frags, index, entry) if tail is None else tail.assign(entry)) is None:
+            return None
+        arg_data, extras = assigned
         if not entry.wildcard and len(extras) > len(entry.optional):
             return None
         if len(extras) < len(entry.optional):
             extras.extend([] for _ in range(len(entry.optional) - len(extras)))
-        return entry, entry.compile_param(slot_data, arg_data, extras)
+        if tail is not None:
+            return tail.slot_data(entry, params), arg_data, extras
+        return {name: chain for targets, chain in zip(entry.slot_targets, params) for name in targets}, arg_data, extras
 
-    async def execute(self, chain: MessageChain):
-        """触发 Commander.
+    def accept(self, chain: MessageChain) -> bool:
+        """检查 chain 能否开始任意命令, 并更新 `stats`.
+
+        只对 chain 的第一个 token 分词. `match_root` 的字面量出边即为所有命令首 token 的索引,
+        若根节点存在 Slot 则无法拒绝任何消息.
 
         Args:
-            chain (MessageChain): 触发的消息链
+            chain (MessageChain): 消息链
+
+        Returns:
+            bool: 是否需要进入匹配树查找
         """
+        root = self.match_root.next
+        if Sentinel in root or ((frag := self.split_cache.first(chain)) is not None and extract_str(frag) in root):
+            self.stats.walked += 1
+            return True
+        self.stats.rejected += 1
+        return False
 
-        frags = split(chain)
-        pending_exec: Dict[int, List[Tuple[CommandEntry, dict]]] = {}
-        pending_next: Deque[ParseData] = Deque([ParseData(0, self.match_root, ())])
+    def match(
+        self, frags: Sequence[ChainContent], *, sampled: bool = False
+    ) -> Dict[int, List[Tuple[CommandEntry, dict]]]:
+        """在匹配树上查找可以处理 frags 的命令.
 
-        dispatchers: List[T_Dispatcher] = [param_dispatcher]
+        对于 `LazySplit`, 只会分词到仍有分支存活的深度, Arg 与 wildcard 需要时才会完整分词.
 
-        if event := self.event_ctx.get(None):
-            dispatchers += resolve_dispatchers_mixin([event.Dispatcher])
+        Args:
+            frags (Sequence[ChainContent]): `split` 或 `SplitCache.lazy` 后的消息链
+            sampled (bool, optional): 是否由 `profiler` 计时
 
-        def push_pending(index: int, nxt: MatchNode[CommandEntry], params: Tuple[ChainContent, ...]):
-            for entry in nxt.entries:
-                with contextlib.suppress(ValueError):
-                    if res := self.parse_rest(index, frags, params, entry):
-                        pending_exec.setdefault(res[0].priority, []).append(res)
-            pending_next.append(ParseData(index, nxt, params))
+        Returns:
+            Dict[int, List[Tuple[CommandEntry, dict]]]: 优先级 -> 匹配成功的 entry 及其参数
+        """
+        automaton = self.freeze()
+        transitions, slots, entries, positions = (
+            automaton.transitions,
+            automaton.slots,
+            automaton.entries,
+            automaton.positions,
+        )
+        arg_headers = self._arg_headers
+        pending_exec: Dict[int, List[Tuple[CommandEntry, dict]]] = {}
+        pending_next: Deque[Tuple[int, int]] = Deque([(0, 0)])  # (index, state)
+        profiler = self._profiler
+        if sampled and profiler:
+            start, rest_time = perf_counter(), profiler.rest_time
+
+        def push_pending(index: int, state: int):
+            if entries[state]:
+                params = tuple(frags[i] for i in positions[state])
+                # entries on the same state share one scan of the rest tokens
+                tail = TailIndex(frags, index, arg_headers[state]) if len(entries[state]) > 1 else None
+                for entry in entries[state]:
+                    if profiler:
+                        if res := profiler.parse(self, index, frags, params, entry, sampled, tail):
+                            pending_exec.setdefault(res[0].priority, []).append(res)
+                        continue
+                    with contextlib.suppress(ValueError):
+                        if res := self.parse_rest(index, frags, params, entry, tail):
+                            pending_exec.setdefault(res[0].priority, []).append(res)
+            pending_next.append((index, state))
 
         while pending_next:
-            params: Tuple[ChainContent, ...]
-            index, node, params = pending_next.popleft()
-            if index >= len(frags):
+            index, state = pending_next.popleft()
+            if not reach(frags, index):
                 continue
             frag = frags[index]
             index += 1
-            if (str_frag := extract_str(frag)) in node.next:
-                if TYPE_CHECKING:
-                    assert isinstance(str_frag, str)
-                nxt = node.next[str_frag]
-                push_pending(index, nxt, params)
-            if Sentinel in node.next:
-                nxt = node.next[Sentinel]
-                push_pending(index, nxt, params + (frag,))
-
-        for _, execution in sorted(pending_exec.items()):
-            tasks: List[asyncio.Task] = []
-            for entry, param in execution:
-                commander_param_ctx.set(param)
-                tasks.append(self.broadcast.loop.create_task(self.broadcast.Executor(entry, dispatchers)))
+            if (str_frag := extract_str(frag)) is not None and (nxt := transitions[state].get(str_frag)) is not None:
+                push_pending(index, nxt)
+            if (nxt := slots[state]) >= 0:
+                push_pending(index, nxt)
+
+        if sampled and profiler:
+            profiler.walk_time += perf_counter() - start - (profiler.rest_time - rest_time)
+        return pending_exec
+
+    def explain(self, chain: MessageChain) -> MatchTrace:
+        """像 `execute` 一样匹配 chain 并记录每一步, 但不执行任何处理函数.
+
+        不会更新 `stats`, `profiler` 与 `split_cache`. 延迟生成的 ModelField 会在校验时生成.
+
+        Args:
+            chain (MessageChain): 消息链
+
+        Returns:
+            MatchTrace: 匹配轨迹, `str()` 后为可读的文本
+        """
+        start = perf_counter()
+        frags = list(iter_split(chain))
+        trace = MatchTrace(frags, False, split_time=perf_counter() - start)
+        root = self.match_root.next
+        trace.accepted = Sentinel in root or (bool(frags) and extract_str(frags[0]) in root)
+        automaton = self.freeze()
+        pending_next: Deque[Tuple[int, int]] = Deque([(0, 0)])
+
+        def visit(index: int, state: int):
+            if automaton.entries[state]:
+                params = tuple(frags[i] for i in automaton.positions[state])
+                for entry in automaton.entries[state]:
+                    trace.candidates.append(self._explain_entry(index, state, frags, params, entry))
+            pending_next.append((index, state))
+
+        while trace.accepted and pending_next:
+            trace.fanout = max(trace.fanout, len(pending_next))
+            index, state = pending_next.popleft()
+            step_start = perf_counter()
+            step = StepTrace(index, state, frags[index] if index < len(frags) else None)
+            trace.steps.append(step)
+            if step.token is None:
+                continue
+            if (str_frag := extract_str(step.token)) is not None:
+                step.literal = automaton.transitions[state].get(str_frag)
+            if automaton.slots[state] >= 0:
+                step.slot = automaton.slots[state]
+            step.time = perf_counter() - step_start
+            for nxt in (step.literal, step.slot):
+                if nxt is not None:
+                    visit(index + 1, nxt)
+
+        trace.total_time = perf_counter() - start
+        return trace
+
+    def _explain_entry(
+        self,
+        index: int,
+        state: int,
+        frags: ChainContentList,
+        params: Tuple[ChainContent, ...],
+        entry: CommandEntry,
+    ) -> CandidateTrace:
+        start = perf_counter()
+        scanned = self.scan_rest(index, frags, params, entry)
+        candidate = CandidateTrace(entry, index, state, "unfit", scan_time=perf_counter() - start)
+        if scanned is None:
+            rest, slots = len(frags) - index, len(entry.optional)
+            candidate.reason = (
+                f"{rest} rest token(s) do not fit {slots} optional slot(s)"
+                f"{', the wildcard' if entry.wildcard else ''}{' or the Args' if entry.header_map else ''}"
+            )
+            return candidate
+        start = perf_counter()
+        try:
+            candidate.param = entry.compile_param(*scanned)
+            candidate.outcome = "matched"
+        except ValueError as e:
+            candidate.outcome = "invalid"
+            candidate.reason = f"{_failed_param(entry, *scanned)}: {e}"
+        candidate.validate_time = perf_counter() - start
+        return candidate
+
+    async def dispatch(
+        self,
+        pending_exec: Dict[int, List[Tuple[CommandEntry, dict]]],
+        dispatchers: List[T_Dispatcher],
+        *,
+        sampled: bool = False,
+    ) -> None:
+        """按优先级依次执行匹配成功的命令.
+
+        低优先级的命令会等待高优先级命令的传播决定: `propagation` 为 `"wait"` 的命令执行完毕,
+        `"early"` 的命令调用 `resolve_propagation` 或执行完毕, `"continue"` 的命令不会被等待.
+        所有命令执行完毕后才会返回; 自身被取消时, 尚未执行完毕的命令会被一并取消.
+
+        Args:
+            pending_exec (Dict[int, List[Tuple[CommandEntry, dict]]]): `match` 的结果
+            dispatchers (List[T_Dispatcher]): 执行时使用的 Dispatcher
+            sampled (bool, optional): 是否由 `profiler` 计时
+
+        Raises:
+            PropagationCancelled: 某个命令取消了事件传播
+        """
+        loop = self.broadcast.loop
+        outstanding: List[asyncio.Task] = []  # handlers that lower priorities do not wait for
+        decisions: List[asyncio.Future] = []
+        try:
+            for _, execution in sorted(pending_exec.items()):
+                # inlined handlers start at once; after a task has been scheduled they would overtake it
+                if self.inline and not outstanding and len(execution) == 1 and execution[0][0].propagation == "wait":
+                    entry, param = execution[0]
+                    context = copy_context()  # same isolation as a task
+                    context.run(commander_param_ctx.set, param)
+                    try:
+                        await InContext(context, context.run(self.run, entry, dispatchers, sampled))
+                    except PropagationCancelled:
+                        raise PropagationCancelled from None
+                    except Exception:  # reported by Executor, same as an exception left in a task
+                        pass
+                    continue
+                decisions = []
+                for entry, param in execution:
+                    commander_param_ctx.set(param)
+                    if entry.propagation == "wait":
+                        decisions.append(loop.create_task(self.run(entry, dispatchers, sampled)))
+                        continue
+                    decision: asyncio.Future[bool] = loop.create_future()
+                    if entry.propagation == "continue":
+                        decision.set_result(False)
+                    else:
+                        decisions.append(decision)
+                    outstanding.append(loop.create_task(_propagate(decision, self.run(entry, dispatchers, sampled))))
+                if not decisions:
+                    continue
+                done, _ = await asyncio.wait(decisions)
+                if [decision for decision in done if _stops_propagation(decision)]:
+                    raise PropagationCancelled
+        except asyncio.CancelledError:
+            _cancel(outstanding + [decision for decision in decisions if isinstance(decision, asyncio.Task)])
+            outstanding = []
+            raise
+        finally:
+            if outstanding:
+                try:
+                    await asyncio.wait(outstanding)
+                except asyncio.CancelledError:
+                    _cancel(outstanding)
+                    raise
+                for task in outstanding:
+                    if not task.cancelled():
+                        task.exception()  # reported by Executor
+
+    def run(self, entry: CommandEntry, dispatchers: List[T_Dispatcher], sampled: bool = False) -> Awaitable[Any]:
+        """使用 Executor 执行 entry, 设置了 `CommandEntry.limit` 时受其并发限制.
+
+        参数需已设置在 `commander_param_ctx` 中.
+        """
+        if entry.limit:
+            return entry.limit.run(entry, commander_param_ctx.get(), lambda: self._run(entry, dispatchers, sampled))
+        return self._run(entry, dispatchers, sampled)
+
+    def _run(self, entry: CommandEntry, dispatchers: List[T_Dispatcher], sampled: bool) -> Awaitable[Any]:
+        if not (profiler := self._profiler):
+            return self.broadcast.Executor(entry, dispatchers)
+        entry.stats.dispatches += 1  # type: ignore
+        if sampled:
+            return profiler.execute(entry, self.broadcast.Executor(entry, dispatchers))
+        return self.broadcast.Executor(entry, dispatchers)
+
+    def split(self, chain: MessageChain, sampled: bool = False) -> Sequence[ChainContent]:
+        """对 chain 分词, 通常按需进行; sampled 时完整分词并计入 `profiler`.
+
+        按需分词的结果存放在消息派生数据缓存中, 由使用同一 `split_cache` 的 Commander 共用.
+        """
+        if not (sampled and self._profiler):
+            return derived_cache.get(chain, self.split_cache.lazy)
+        start = perf_counter()
+        frags = self.split_cache.split(chain)
+        self._profiler.split_time += perf_counter() - start
+        return frags
+
+    async def execute(self, chain: MessageChain):
+        """触发 Commander.
+
+        Args:
+            chain (MessageChain): 触发的消息链
+        """
+        if not self.accept(chain):
+            return
+
+        sampled = self._profiler.tick() if self._profiler else False
+        if not (pending_exec := self.match(self.split(chain, sampled), sampled=sampled)):
+            return
+
+        await self.dispatch(pending_exec, self.resolve_dispatchers(self.event_ctx.get(None)), sampled=sampled)
+
+    def resolve_dispatchers(self, event: Optional[T_Event]) -> List[T_Dispatcher]:
+        """获取执行命令时使用的 Dispatcher, 按事件类型缓存.
+
+        命令自身的 Dispatcher 已在注册时解析, 由 Executor 追加在其后, 因此缓存只与事件类型有关.
+
+        Args:
+            event (Optional[T_Event]): 当前事件
+
+        Returns:
+            List[T_Dispatcher]: 参数 Dispatcher 与事件 Dispatcher, 不应被修改
+        """
+        if (dispatchers := self._dispatcher_cache.get(event.__class__)) is None:
+            dispatchers = self._dispatcher_cache[event.__class__] = [
+                param_dispatcher,
+                *(resolve_dispatchers_mixin([event.Dispatcher]) if event else ()),
+            ]
+        return dispatchers
+
+    async def execute_many(self, messages: Iterable[Tuple[MessageChain, T_Event]]) -> None:
+        """批量触发 Commander.
+
+        所有消息的执行在一轮中统一调度.
+        对于每条消息, 优先级与 `PropagationCancelled` 的语义与 `execute` 相同.
+
+        Args:
+            messages (Iterable[Tuple[MessageChain, T_Event]]): 消息链与对应的事件
+        """
+        tasks: List[asyncio.Task] = []
+        loop = self.broadcast.loop
+
+        for chain, event in messages:
+            if not self.accept(chain):
+                continue
+            sampled = self._profiler.tick() if self._profiler else False
+            if not (pending_exec := self.match(self.split(chain, sampled), sampled=sampled)):
+                continue
+            dispatchers = self.resolve_dispatchers(event)
+            ctx = copy_context()
+            ctx.run(self.event_ctx.set, event)
+            ctx.run(self.broadcast.event_ctx.set, event)
+            if len(pending_exec) == 1:  # no lower priority to hold back, schedule the entries directly
+                for entry, param in next(iter(pending_exec.values())):
+                    ctx.run(commander_param_ctx.set, param)
+                    coro = ctx.run(self.run, entry, dispatchers, sampled)  # the limit reads the param from ctx
+                    tasks.append(ctx.run(loop.create_task, coro))
+            else:
+                tasks.append(ctx.run(loop.create_task, self.dispatch(pending_exec, dispatchers, sampled=sampled)))
+
+        if tasks:
             done, _ = await asyncio.wait(tasks)
             for task in done:
-                if task.exception() and isinstance(task.exception(), PropagationCancelled):
-                    raise PropagationCancelled
+                task.exception()  # PropagationCancelled only stops its own message
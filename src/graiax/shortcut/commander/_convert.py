@@ -0,0 +1,226 @@
+"""Commander 参数的预编译转换器.
+
+在注册时根据参数类型生成专用的转换函数, 避免在每次匹配时经过 pydantic 的 `ModelField.validate`.
+不支持的类型 (如用户的 `BaseModel`) 会回退到 pydantic.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, List, Optional
+
+from graia.amnesia.message import Element, MessageChain, Text
+from graia.amnesia.message import __message_chain_class__ as _msg_
+from graia.amnesia.message import __text_element_class__ as _text_
+from pydantic.fields import ModelField
+from typing_extensions import get_args, get_origin
+
+from .._typing_util import MaybeFlag, Sentinel, is_subclass
+from ._util import raw
+
+Converter = Callable[[Any], Any]
+
+BOOL_FALSE = {0, "0", "off", "f", "false", "n", "no"}
+BOOL_TRUE = {1, "1", "on", "t", "true", "y", "yes"}
+
+
+def to_str(v: Any) -> str:
+    if isinstance(v, str):
+        return v.value if isinstance(v, Enum) else v
+    if isinstance(v, (float, int, Decimal)):
+        return str(v)
+    if isinstance(v, (bytes, bytearray)):
+        return v.decode()
+    raise ValueError("str type expected")
+
+
+def to_int(v: Any) -> int:
+    if isinstance(v, int) and not (v is True or v is False):
+        return v
+    try:
+        return int(v)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("value is not a valid integer") from None
+
+
+def to_bool(v: Any) -> bool:
+    if v is True or v is False:
+        return v
+    if isinstance(v, bytes):
+        v = v.decode()
+    if isinstance(v, str):
+        v = v.lower()
+    try:
+        if v in BOOL_TRUE:
+            return True
+        if v in BOOL_FALSE:
+            return False
+    except TypeError:
+        pass
+    raise ValueError("value could not be parsed to a boolean")
+
+
+def instance_of(type_: type) -> Converter:
+    def check(v: Any) -> Any:
+        if isinstance(v, type_):
+            return v
+        raise ValueError(f"instance of {type_.__name__} expected")
+
+    return check
+
+
+_PRIMITIVES = {str: to_str, int: to_int, bool: to_bool}
+
+
+def type_converter(type_: Any) -> Optional[Converter]:
+    """获取 type_ 的类型转换函数, 不支持时返回 None."""
+    if type_ in _PRIMITIVES:
+        return _PRIMITIVES[type_]
+    if is_subclass(type_, (MessageChain, Element)):
+        return instance_of(type_)
+
+
+def chain_converter(type_: Any, default: Callable[[], Any]) -> Converter:
+    """生成与 `chain_validator` 等价的, 针对 type_ 特化的转换函数."""
+    if is_subclass(type_, MessageChain):
+
+        def convert(value: Any) -> Any:
+            if not isinstance(value, list):
+                return default() if value is None else value
+            return _msg_(list(value)) if value else default()  # the split may be shared by other messages
+
+    elif is_subclass(type_, Text):
+
+        def convert(value: Any) -> Any:
+            if not isinstance(value, list):
+                return default() if value is None else value
+            if not value:
+                return default()
+            assert len(value) == 1
+            assert value[0].__class__ is str
+            return _text_(value[0])
+
+    elif is_subclass(type_, Element):
+
+        def convert(value: Any) -> Any:
+            if not isinstance(value, list):
+                return default() if value is None else value
+            if not value:
+                return default()
+            assert len(value) == 1
+            assert value[0].__class__ is type_
+            return value[0]
+
+    else:  # str, int, bool
+
+        def convert(value: Any) -> Any:
+            if not isinstance(value, list):
+                return default() if value is None else value
+            if not value:
+                return default()
+            if len(value) == 1 and value[0].__class__ is str:
+                return value[0]
+            return str(_msg_(value))
+
+    return convert
+
+
+def raw_converter(value: Any) -> Any:
+    if not isinstance(value, list):
+        return value
+    return _msg_([_text_(" ")]).join(
+        [_msg_([_text_(e) if isinstance(e, str) else e for e in content]) for content in value]
+    )
+
+
+def _field_default(default_factory: MaybeFlag[Callable[[], Any]]) -> Callable[[], Any]:
+    return (lambda: None) if default_factory is Sentinel else default_factory
+
+
+def _finalize(pre: Converter, casters: List[Callable], field: ModelField, post: Converter) -> Converter:
+    if casters:
+        config = field.model_config
+
+        def convert(v: Any) -> Any:
+            v = pre(v)
+            for caster in casters:
+                v = caster(None, v, {}, field, config)
+            if v is None:
+                raise ValueError("none is not an allowed value")
+            return post(v)
+
+    else:
+
+        def convert(v: Any) -> Any:
+            v = pre(v)
+            if v is None:
+                raise ValueError("none is not an allowed value")
+            return post(v)
+
+    def guarded(v: Any) -> Any:
+        try:
+            return convert(v)
+        except (TypeError, AssertionError) as e:
+            raise ValueError(e) from e
+
+    return guarded
+
+
+def pydantic_converter(field: ModelField, loc: str) -> Converter:
+    """使用 pydantic `ModelField` 校验值的转换函数."""
+
+    def convert(v: Any) -> Any:
+        res, err = field.validate(v, {field.name: v}, loc=loc)
+        if err:
+            raise ValueError(err)
+        return res
+
+    return convert
+
+
+def compile_converter(
+    field: ModelField,
+    loc: str,
+    type_: Any,
+    default_factory: MaybeFlag[Callable[[], Any]],
+    wildcard: bool = False,
+    builtin: bool = True,
+) -> Converter:
+    """编译参数的转换函数.
+
+    Args:
+        field (ModelField): 参数对应的 pydantic 字段, 用于调用额外的 type caster 与回退
+        loc (str): 出错时报告的位置
+        type_ (Any): 参数类型
+        default_factory (MaybeFlag[Callable[[], Any]]): 默认值工厂函数
+        wildcard (bool, optional): 是否为 wildcard
+        builtin (bool, optional): 第一个 validator 是否为内置的 `chain_validator` / `wildcard_validator`
+
+    Returns:
+        Converter: 转换函数
+    """
+    if not builtin or field.allow_none:
+        return pydantic_converter(field, loc)
+    casters: List[Callable] = field.pre_validators[1:] if field.pre_validators else []
+    default = _field_default(default_factory)
+    if not wildcard:
+        if post := type_converter(type_):
+            return _finalize(chain_converter(type_, default), casters, field, post)
+        return pydantic_converter(field, loc)
+    if type_ is raw:
+        return _finalize(raw_converter, casters, field, instance_of(raw))
+    if get_origin(type_) not in (list, List) or not (item := type_converter(inner := get_args(type_)[0])):
+        return pydantic_converter(field, loc)
+    item_pre = chain_converter(inner, default)
+
+    def pre(value: Any) -> Any:
+        if not isinstance(value, list):
+            return value
+        return [item_pre(v) for v in value] or default() or []
+
+    def post(value: Any) -> List[Any]:
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            raise ValueError("value is not a valid list")
+        return [item(v) for v in value]
+
+    return _finalize(pre, casters, field, post)
@@ -0,0 +1,96 @@
+"""`Commander.explain` 的匹配轨迹."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
+
+from ._util import ChainContent, ChainContentList
+
+if TYPE_CHECKING:
+    from . import CommandEntry
+
+Outcome = Literal["matched", "unfit", "invalid"]
+
+
+def _fmt(content: ChainContent) -> str:
+    return "".join(str(piece) for piece in content)
+
+
+@dataclass
+class StepTrace:
+    """匹配树上的一步: 在 state 读取下标为 index 的 token"""
+
+    index: int
+    state: int
+    token: Optional[ChainContent]
+    """读取的 token, 消息已结束时为 None"""
+    literal: Optional[int] = None
+    """字面量转移到的状态"""
+    slot: Optional[int] = None
+    """Slot 转移到的状态"""
+    time: float = 0.0
+
+    def __str__(self) -> str:
+        if self.token is None:
+            return f"[{self.index}] state {self.state}: end of message"
+        targets = [f"{_fmt(self.token)!r} -> {self.literal}"] if self.literal is not None else []
+        if self.slot is not None:
+            targets.append(f"{{slot}} -> {self.slot}")
+        return f"[{self.index}] state {self.state}: {', '.join(targets) or 'dead end'} ({self.time * 1e6:.1f}us)"
+
+
+@dataclass
+class CandidateTrace:
+    """到达 entry 所在状态后, 对剩余 token 的解析与校验"""
+
+    entry: CommandEntry
+    index: int
+    """剩余 token 的起始下标"""
+    state: int
+    outcome: Outcome
+    """`"matched"`: 匹配成功, `"unfit"`: 剩余 token 无法对应可选 Slot / Arg, `"invalid"`: 参数校验失败"""
+    reason: str = ""
+    param: Optional[Dict[str, Any]] = None
+    """匹配成功时传给处理函数的参数"""
+    scan_time: float = 0.0
+    validate_time: float = 0.0
+
+    def __str__(self) -> str:
+        name = getattr(self.entry.callable, "__qualname__", self.entry.callable)
+        detail = self.param if self.outcome == "matched" else self.reason
+        cost = f"scan {self.scan_time * 1e6:.1f}us, validate {self.validate_time * 1e6:.1f}us"
+        return f"{name} (priority {self.entry.priority}) @ [{self.index}] {self.outcome}: {detail} ({cost})"
+
+
+@dataclass
+class MatchTrace:
+    """`Commander.explain` 的结果"""
+
+    frags: ChainContentList
+    """消息链的分词结果"""
+    accepted: bool
+    """首个 token 能否开始任意命令, 为 False 时 `execute` 不会进入匹配树"""
+    steps: List[StepTrace] = field(default_factory=list)
+    candidates: List[CandidateTrace] = field(default_factory=list)
+    fanout: int = 0
+    """查找过程中同时存活的分支数的最大值, 以 Slot 开头的命令会使其变大"""
+    split_time: float = 0.0
+    total_time: float = 0.0
+
+    @property
+    def matched(self) -> List[CandidateTrace]:
+        """匹配成功的命令, 按执行顺序排列"""
+        return sorted(
+            (candidate for candidate in self.candidates if candidate.outcome == "matched"),
+            key=lambda candidate: candidate.entry.priority,
+        )
+
+    def __str__(self) -> str:
+        lines = [
+            f"tokens: {[_fmt(frag) for frag in self.frags]}",
+            f"accepted: {self.accepted}, steps: {len(self.steps)}, fanout: {self.fanout}, "
+            f"split {self.split_time * 1e6:.1f}us, total {self.total_time * 1e6:.1f}us",
+        ]
+        lines.extend(f"  {step}" for step in self.steps)
+        lines.extend(f"  - {candidate}" for candidate in self.candidates)
+        return "\n".join(lines)
@@ -0,0 +1,128 @@
+"""Commander 命令的并发限制."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Literal,
+    Optional,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from . import CommandEntry
+
+T = TypeVar("T")
+
+Overflow = Literal["queue", "drop", "reject"]
+
+
+class ConcurrencyLimit:
+    """命令的最大并发数与等待队列.
+
+    同一个 ConcurrencyLimit 可以由多个命令共用, 此时它们共享并发额度.
+
+    超出并发数的调用会进入等待队列, 按到达顺序获得额度. 队列已满时按 overflow 处理:
+
+    - `"queue"`: 仍然排队等待, queue_size 不生效
+    - `"drop"`: 静默丢弃本次调用
+    - `"reject"`: 丢弃本次调用, 并以 `(entry, param)` 调用 on_reject (可为异步函数)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        queue_size: int = 0,
+        overflow: Overflow = "queue",
+        on_reject: Optional[Callable[[CommandEntry, dict], Any]] = None,
+    ) -> None:
+        """
+        Args:
+            max_concurrency (int, optional): 同时执行的最大调用数
+            queue_size (int, optional): 等待队列的长度
+            overflow (Literal["queue", "drop", "reject"], optional): 队列已满时的处理方式
+            on_reject (Callable[[CommandEntry, dict], Any], optional): overflow 为 `"reject"` 时的回调
+        """
+        assert max_concurrency >= 1, "max_concurrency should be positive!"
+        assert queue_size >= 0, "queue_size should not be negative!"
+        assert overflow in ("queue", "drop", "reject"), f"Unknown overflow policy: {overflow!r}"
+        self.max_concurrency: int = max_concurrency
+        self.queue_size: int = queue_size
+        self.overflow: Overflow = overflow
+        self.on_reject: Optional[Callable[[CommandEntry, dict], Any]] = on_reject
+        self.running: int = 0
+        """正在执行的调用数"""
+        self.dropped: int = 0
+        """因 `"drop"` 被丢弃的调用数"""
+        self.rejected: int = 0
+        """因 `"reject"` 被拒绝的调用数"""
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        """等待队列的当前长度"""
+        return len(self._waiters)
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot over, running stays the same
+                return
+        self.running -= 1
+
+    async def _acquire(self, entry: CommandEntry, param: dict) -> bool:
+        if self.running < self.max_concurrency and not self._waiters:
+            self.running += 1
+            return True
+        if self.overflow != "queue" and len(self._waiters) >= self.queue_size:
+            if self.overflow == "drop":
+                self.dropped += 1
+            else:
+                self.rejected += 1
+                if self.on_reject and inspect.isawaitable(res := self.on_reject(entry, param)):
+                    await res
+            return False
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # the slot was handed over before the cancellation
+            else:
+                with contextlib.suppress(ValueError):  # may have been skipped by `_release` already
+                    self._waiters.remove(waiter)
+            raise
+        return True
+
+    async def run(self, entry: CommandEntry, param: dict, call: Callable[[], Awaitable[T]]) -> Optional[T]:
+        """在额度内执行 call, 被丢弃或拒绝时返回 None.
+
+        Args:
+            entry (CommandEntry): 被调用的命令
+            param (dict): 本次调用的参数
+            call (Callable[[], Awaitable[T]]): 获得额度后才会被调用
+
+        Returns:
+            Optional[T]: call 的结果
+        """
+        if not await self._acquire(entry, param):
+            return None
+        try:
+            return await call()
+        finally:
+            self._release()
+
+    def __repr__(self) -> str:
+        return (
+            f"ConcurrencyLimit(running={self.running}/{self.max_concurrency}, "
+            f"waiting={self.waiting}/{self.queue_size}, overflow={self.overflow!r})"
+        )
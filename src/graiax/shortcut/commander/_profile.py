@@ -0,0 +1,189 @@
+"""Commander 的按命令耗时统计.
+
+计数 (匹配尝试, 校验失败, 执行) 对每条消息都会更新, 耗时只在每 `sample_every` 条消息中采样一次.
+统计数据存放在注册时分配并挂在 `CommandEntry.stats` 上的 `EntryStats` 中, 记录时不会查表或创建新的容器.
+"""
+from __future__ import annotations
+
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+from ._util import ChainContent
+
+if TYPE_CHECKING:
+    from . import CommandEntry, Commander, TailIndex
+
+
+class EntryStats:
+    """单个 CommandEntry 的累计统计"""
+
+    __slots__ = (
+        "attempts",
+        "failures",
+        "dispatches",
+        "samples",
+        "validate_samples",
+        "exec_samples",
+        "parse_time",
+        "validate_time",
+        "exec_time",
+    )
+
+    def __init__(self) -> None:
+        self.attempts: int = 0
+        """进入 `parse_rest` 的次数"""
+        self.failures: int = 0
+        """参数校验失败 (`ValueError`) 的次数"""
+        self.dispatches: int = 0
+        """交给 Executor 执行的次数"""
+        self.samples: int = 0
+        """被采样计时的匹配尝试次数"""
+        self.validate_samples: int = 0
+        """被采样计时的匹配尝试中, 剩余 token 扫描成功并进入校验的次数"""
+        self.exec_samples: int = 0
+        """被采样计时的执行次数"""
+        self.parse_time: float = 0.0
+        """采样中 `parse_rest` 扫描剩余 token 的总耗时, 不含校验"""
+        self.validate_time: float = 0.0
+        """采样中 `compile_param` 的总耗时"""
+        self.exec_time: float = 0.0
+        """采样中处理函数执行的总耗时"""
+
+
+class EntryReport(NamedTuple):
+    """`CommandProfiler.report` 的单行结果, 耗时为每次采样的平均值 (秒), 校验耗时只计入实际进行了校验的采样"""
+
+    entry: CommandEntry
+    attempts: int
+    failures: int
+    dispatches: int
+    samples: int
+    parse: float
+    validate: float
+    execute: float
+
+
+class CommandProfiler:
+    """Commander 的可选耗时统计.
+
+    Example:
+        >>> commander.profiler = CommandProfiler(sample_every=100)
+        >>> for row in commander.profiler.report()[:10]:
+        ...     print(row.entry, row.attempts, row.validate)
+    """
+
+    def __init__(self, sample_every: int = 64) -> None:
+        """
+        Args:
+            sample_every (int, optional): 每多少条消息采样计时一次, 为 1 时每条消息都计时.
+        """
+        assert sample_every >= 1
+        self.sample_every: int = sample_every
+        self.messages: int = 0
+        """经过 `Commander.execute` / `execute_many` 的消息数"""
+        self.sampled: int = 0
+        """被采样计时的消息数"""
+        self.split_time: float = 0.0
+        """采样中分词的总耗时"""
+        self.walk_time: float = 0.0
+        """采样中匹配树查找的总耗时, 不含 `parse_rest`"""
+        self.rest_time: float = 0.0
+        """采样中 `parse_rest` (含校验) 的总耗时"""
+        self.entries: WeakKeyDictionary[CommandEntry, EntryStats] = WeakKeyDictionary()
+
+    def tick(self) -> bool:
+        """记录一条消息, 返回这条消息是否需要采样计时"""
+        self.messages += 1
+        if self.messages % self.sample_every:
+            return False
+        self.sampled += 1
+        return True
+
+    def stats(self, entry: CommandEntry) -> EntryStats:
+        """获取 entry 的统计, 不存在时创建, 并设为 `entry.stats` 供记录时直接使用"""
+        if (stats := self.entries.get(entry)) is None:
+            stats = self.entries[entry] = EntryStats()
+        entry.stats = stats
+        return stats
+
+    def parse(
+        self,
+        commander: Commander,
+        index: int,
+        frags: Sequence[ChainContent],
+        params: Tuple[ChainContent, ...],
+        entry: CommandEntry,
+        sampled: bool,
+        tail: Optional[TailIndex] = None,
+    ) -> Optional[Tuple[CommandEntry, dict]]:
+        """统计并执行 `Commander.parse_rest`, 校验失败时返回 None"""
+        stats: EntryStats = entry.stats  # type: ignore
+        stats.attempts += 1
+        try:
+            if not sampled:
+                return commander.parse_rest(index, frags, params, entry, tail)
+            stats.samples += 1
+            start = perf_counter()
+            scanned = commander.scan_rest(index, frags, params, entry, tail)
+            scan_end = perf_counter()
+            stats.parse_time += scan_end - start
+            if scanned is None:
+                self.rest_time += scan_end - start
+                return None
+            stats.validate_samples += 1
+            try:
+                return entry, entry.compile_param(*scanned)
+            finally:
+                end = perf_counter()
+                stats.validate_time += end - scan_end
+                self.rest_time += end - start
+        except ValueError:
+            stats.failures += 1
+            return None
+
+    async def execute(self, entry: CommandEntry, awaitable: Awaitable[Any]) -> Any:
+        """计时执行 entry 的处理函数"""
+        start = perf_counter()
+        try:
+            return await awaitable
+        finally:
+            stats: EntryStats = entry.stats  # type: ignore
+            stats.exec_samples += 1
+            stats.exec_time += perf_counter() - start
+
+    def report(self) -> List[EntryReport]:
+        """按采样平均总耗时从高到低排列的各命令统计"""
+        rows: List[EntryReport] = []
+        for entry, stats in list(self.entries.items()):
+            samples = stats.samples or 1
+            rows.append(
+                EntryReport(
+                    entry,
+                    stats.attempts,
+                    stats.failures,
+                    stats.dispatches,
+                    stats.samples,
+                    stats.parse_time / samples,
+                    stats.validate_time / (stats.validate_samples or 1),
+                    stats.exec_time / (stats.exec_samples or 1),
+                )
+            )
+        rows.sort(key=lambda row: row.parse + row.validate + row.execute, reverse=True)
+        return rows
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        self.messages = self.sampled = 0
+        self.split_time = self.walk_time = self.rest_time = 0.0
+        for stats in self.entries.values():
+            stats.__init__()  # entries keep their slot
@@ -0,0 +1,152 @@
+"""命令首 token 的近似查找 ("您是否想输入").
+
+使用对称删除 (symmetric delete) 索引: 每个词删除至多 `depth` 个字符后的所有变体都指向该词.
+查询时只需对查询词做同样的删除, 再用编辑距离校验少量候选, 与命令数量基本无关.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _distance_one(a: str, b: str) -> int:
+    """limit 为 1 时的快速路径, a 不短于 b 且 a != b"""
+    index = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), len(b))
+    if len(a) != len(b):
+        return 1 if a[index + 1 :] == b[index:] else 2
+    if a[index + 1 :] == b[index + 1 :]:
+        return 1
+    swapped = a[index] == b[index + 1 : index + 2] and a[index + 1 : index + 2] == b[index]
+    return 1 if swapped and a[index + 2 :] == b[index + 2 :] else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """a 与 b 的编辑距离 (相邻字符交换计为一次), 超过 limit 时返回 limit + 1"""
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    if limit <= 1:
+        return _distance_one(a, b) if limit else 1
+    # strip the common prefix, the first differing character is then substituted, deleted, inserted or swapped
+    start = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), len(b))
+    a, b = a[start:], b[start:]
+    if not b:
+        return len(a)
+    rests = [(a[1:], b[1:]), (a[1:], b), (a, b[1:])]
+    if a[1:2] == b[:1] and a[:1] == b[1:2]:
+        rests.append((a[2:], b[2:]))
+    return 1 + min(edit_distance(x, y, limit - 1) for x, y in rests)
+
+
+MIN_VARIANT = 2
+"""索引中变体的最短长度, 更短的变体会匹配过多的词, 查询时也不会用到"""
+
+
+def deletes(word: str, depth: int) -> List[Set[str]]:
+    """word 删除 0 至 depth 个字符后得到的, 长度不小于 `MIN_VARIANT` 的字符串, 第 i 项为删除 i 个字符的结果"""
+    levels: List[Set[str]] = [{word}]
+    for _ in range(min(depth, len(word) - MIN_VARIANT)):
+        levels.append(
+            {variant[:index] + variant[index + 1 :] for variant in levels[-1] for index in range(len(variant))}
+        )
+    return levels
+
+
+class SuggestIndex:
+    """可增量维护的近似查找索引.
+
+    同一个词可以被多次添加 (如多个命令共用别名), 全部移除后才会从索引中删除.
+    变体按删除的字符数分开存放, 查询时从编辑距离 0 开始逐步放宽,
+    已找到 k 个词时不再校验其余的候选.
+    """
+
+    __slots__ = ("depth", "counts", "variants")
+
+    depth: int
+    counts: Dict[str, int]
+    variants: List[Dict[str, List[str]]]
+    """删除 i 个字符后的变体 -> 词"""
+
+    def __init__(self, depth: int = 2, words: Iterable[str] = ()) -> None:
+        """
+        Args:
+            depth (int, optional): 支持的最大编辑距离, 索引大小约为 O(词长 ^ depth)
+            words (Iterable[str], optional): 初始词
+        """
+        self.depth = depth
+        self.counts = {}
+        self.variants = [{} for _ in range(depth + 1)]
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        if (count := self.counts.get(word, 0)) == 0:
+            for variants, level in zip(self.variants, deletes(word, self.depth)):
+                for variant in level:
+                    if (bucket := variants.get(variant)) is None:
+                        variants[variant] = [word]
+                    else:
+                        bucket.append(word)
+        self.counts[word] = count + 1
+
+    def remove(self, word: str) -> None:
+        if (count := self.counts.get(word, 0)) > 1:
+            self.counts[word] = count - 1
+            return
+        if not count:
+            return
+        del self.counts[word]
+        for variants, level in zip(self.variants, deletes(word, self.depth)):
+            for variant in level:
+                bucket = variants[variant]
+                bucket.remove(word)
+                if not bucket:
+                    del variants[variant]
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def query(self, word: str, k: int = 3, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """查找与 word 最接近的至多 k 个词.
+
+        Args:
+            word (str): 查询词
+            k (int, optional): 返回的数量
+            max_distance (int, optional): 最大编辑距离, 默认为 `depth`. \
+                不超过 `(len(word) - 1) // 2`, 以免为短词给出几乎不相关的结果.
+
+        Returns:
+            List[Tuple[str, int]]: (词, 编辑距离), 按距离与字典序排列
+        """
+        limit = min(self.depth if max_distance is None else max_distance, self.depth, max((len(word) - 1) // 2, 0))
+        levels = deletes(word, limit)
+        found: Dict[str, int] = {}
+        farther: Set[str] = set()  # candidates beyond the current distance
+        for distance in range(limit + 1):
+            # a word within `distance` shares a variant with word, each deleting at most `distance` characters
+            candidates, farther = farther, set()
+            for query_depth, level in enumerate(levels[: distance + 1]):
+                for depth in range(distance + 1) if query_depth == distance else (distance,):
+                    variants = self.variants[depth]
+                    candidates.update(
+                        candidate
+                        for variant in level
+                        for candidate in variants.get(variant, ())
+                        if candidate not in found
+                    )
+            # words closer than `distance` are all found, the rest rank by spelling once within it
+            for candidate in sorted(candidates):
+                if len(found) >= k:
+                    break
+                if (result := edit_distance(word, candidate, distance)) <= distance:
+                    found[candidate] = result
+                else:
+                    farther.add(candidate)
+            if len(found) >= k:
+                break
+        return sorted(found.items(), key=lambda item: (item[1], item[0]))[:k]
@@ -4,19 +4,29 @@ import abc
 import functools
 import inspect
 import re
-from contextvars import ContextVar
+import weakref
+from collections import OrderedDict
+from contextvars import Context, ContextVar
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import (
     Any,
+    Awaitable,
     Callable,
+    Generator,
     Generic,
     Iterable,
+    Iterator,
     List,
+    Mapping,
     MutableMapping,
+    NamedTuple,
+    Sequence,
+    Tuple,
     TypeVar,
     Union,
 )
-from weakref import WeakKeyDictionary, WeakSet
+from weakref import WeakKeyDictionary, WeakSet, WeakValueDictionary
 
 from graia.amnesia.message import Element, MessageChain, Text
 from graia.broadcast.entities.decorator import Decorator
@@ -27,6 +37,7 @@ from graia.broadcast.utilles import dispatcher_mixin_handler
 from typing_extensions import Self
 
 from .._typing_util import MaybeFlag, Sentinel
+from .._util import content_snapshot
 
 T = TypeVar("T")
 
@@ -72,13 +83,22 @@ def unescape(string: str) -> str:
     return string.strip()
 
 
+_interned: WeakValueDictionary[frozenset[str], frozenset[str]] = WeakValueDictionary()
+
+
+def intern_choice(choice: Iterable[str]) -> frozenset[str]:
+    """返回与 choice 相等的共享 frozenset, 使不同命令的相同别名只保存一份"""
+    choice = frozenset(choice)
+    return _interned.setdefault(choice, choice)
+
+
 @dataclass(frozen=True, init=False)
 class TextFrag:
     __slots__ = "choice"
     choice: frozenset[str]
 
     def __init__(self, choice: Iterable[str] | str) -> None:
-        object.__setattr__(self, "choice", frozenset((choice,) if isinstance(choice, str) else choice))
+        object.__setattr__(self, "choice", intern_choice((choice,) if isinstance(choice, str) else choice))
 
 
 @dataclass(frozen=True, init=False)
@@ -87,7 +107,7 @@ class ParamFrag:
     names: frozenset[str]
 
     def __init__(self, names: Iterable[str]) -> None:
-        object.__setattr__(self, "names", frozenset(names))
+        object.__setattr__(self, "names", intern_choice(names))
 
 
 class AnnotatedParam:
@@ -202,25 +222,43 @@ class MatchEntry:
 T_MatchEntry = TypeVar("T_MatchEntry", bound=MatchEntry)
 
 
+EMPTY_MAPPING: Mapping[Any, Any] = MappingProxyType({})
+"""共享的只读空映射"""
+
+EMPTY_SET: frozenset[Any] = frozenset()
+"""共享的只读空集合"""
+
+
 class MatchNode(Generic[T_MatchEntry]):
+    """匹配树节点.
+
+    没有出边或 entry 的节点共享只读的 `EMPTY_MAPPING` / `EMPTY_SET`, 需要时才创建 dict 与 WeakSet.
+    """
+
     __slots__ = ("next", "entries")
     next: dict[MaybeFlag[str], MatchNode[T_MatchEntry]]
     entries: WeakSet[T_MatchEntry]
 
     def __init__(self) -> None:
-        self.next = {}
-        self.entries = WeakSet()
+        self.next = EMPTY_MAPPING  # type: ignore
+        self.entries = EMPTY_SET  # type: ignore
 
     def copy(self) -> Self:
         new_obj = self.__class__()
-        new_obj.next = self.next.copy()
-        new_obj.entries = self.entries.copy()
+        if self.next:
+            new_obj.next = self.next.copy()
+        if self.entries:
+            new_obj.entries = self.entries.copy()
         return new_obj
 
     def push(self, entry: T_MatchEntry, index: int = 0) -> None:
         if index >= len(entry.nodes):
+            if self.entries is EMPTY_SET:
+                self.entries = WeakSet()
             self.entries.add(entry)
             return
+        if self.next is EMPTY_MAPPING:
+            self.next = {}
         current: MaybeFlag[frozenset[str]] = entry.nodes[index]
         if current is Sentinel:
             self.next.setdefault(current, MatchNode()).push(entry, index + 1)
@@ -242,11 +280,127 @@ class MatchNode(Generic[T_MatchEntry]):
                 for field in current:
                     self.next[field] = new_node
 
+    def remove(self, entry: T_MatchEntry, index: int = 0) -> None:
+        """从匹配树中移除 entry.
+
+        移除后为空的分支会被剪去, `push` 时因冲突而复制出的节点若与兄弟节点重新等价, 会被合并回去.
+
+        Args:
+            entry (T_MatchEntry): 要移除的 entry
+            index (int, optional): entry 在 self 上对应的 token 下标
+        """
+        if index >= len(entry.nodes):
+            if self.entries:
+                self.entries.discard(entry)
+            if not self.entries:
+                self.entries = EMPTY_SET  # type: ignore
+            return
+        current: MaybeFlag[frozenset[str]] = entry.nodes[index]
+        touched: dict[MatchNode[T_MatchEntry], list[MaybeFlag[str]]] = {}
+        for piece in (Sentinel,) if current is Sentinel else current:
+            if piece in self.next:
+                touched.setdefault(self.next[piece], []).append(piece)
+        for node, pieces in touched.items():
+            node.remove(entry, index + 1)
+            if node.empty:
+                for piece in pieces:
+                    del self.next[piece]
+            elif current is not Sentinel:
+                self._merge(node, pieces, index)
+        if not self.next:
+            self.next = EMPTY_MAPPING  # type: ignore
+
+    @property
+    def empty(self) -> bool:
+        return not self.next and not self.entries
+
+    def _merge(self, node: MatchNode[T_MatchEntry], pieces: list[MaybeFlag[str]], index: int) -> None:
+        # siblings that may be split from `node` share an alias choice with some entry below it
+        candidates: set[MaybeFlag[str]] = set()
+        for entry in node._walk_entries():
+            if (choice := entry.nodes[index]) is not Sentinel:
+                candidates |= choice
+        for piece in candidates.difference(pieces):
+            sibling = self.next.get(piece)
+            if sibling is not None and sibling is not node and sibling._same(node):
+                for piece in pieces:
+                    self.next[piece] = sibling
+                return
+
+    def _walk_entries(self) -> Iterator[T_MatchEntry]:
+        visited: set[int] = set()
+        stack: list[MatchNode[T_MatchEntry]] = [self]
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            yield from node.entries
+            stack.extend(node.next.values())
+
+    def _same(self, other: MatchNode[T_MatchEntry]) -> bool:
+        if self is other:
+            return True
+        if set(self.entries) != set(other.entries) or self.next.keys() != other.next.keys():
+            return False
+        return all(node._same(other.next[piece]) for piece, node in self.next.items())
+
     def _inspect(self, fwd=""):
         for k, node in self.next.items():
             node._inspect(f"{fwd}{'<PARAM>' if k is Sentinel else k} ")
 
 
+class MatchAutomaton(Generic[T_MatchEntry]):
+    """由 MatchNode 编译而来的只读状态表, 状态 0 为根节点.
+
+    Attributes:
+        transitions (list[dict[str, int]]): 每个状态的字面量转移
+        slots (list[int]): 每个状态的 Slot 转移, 不存在时为 -1
+        entries (list[tuple[T_MatchEntry, ...]]): 到达每个状态时匹配完成的 entry
+        positions (list[tuple[int, ...]]): 到达每个状态的路径上, 被 Slot 消耗的 token 下标
+    """
+
+    __slots__ = ("transitions", "slots", "entries", "positions")
+    transitions: list[dict[str, int]]
+    slots: list[int]
+    entries: list[tuple[T_MatchEntry, ...]]
+    positions: list[tuple[int, ...]]
+
+    def __init__(self, root: MatchNode[T_MatchEntry]) -> None:
+        self.transitions = []
+        self.slots = []
+        self.entries = []
+        self.positions = [()]
+        nodes: list[MatchNode[T_MatchEntry]] = [root]
+        depths: list[int] = [0]
+        states: dict[int, int] = {id(root): 0}
+
+        def state_of(node: MatchNode[T_MatchEntry], positions: tuple[int, ...], depth: int) -> int:
+            if id(node) not in states:
+                states[id(node)] = len(nodes)
+                nodes.append(node)
+                depths.append(depth)
+                self.positions.append(positions)
+            return states[id(node)]
+
+        for state, node in enumerate(nodes):  # nodes grows while iterating, visiting in BFS order
+            positions, depth = self.positions[state], depths[state]
+            self.transitions.append(
+                {
+                    piece: state_of(nxt, positions, depth + 1)
+                    for piece, nxt in node.next.items()
+                    if piece is not Sentinel
+                }
+            )
+            self.slots.append(
+                state_of(node.next[Sentinel], positions + (depth,), depth + 1) if Sentinel in node.next else -1
+            )
+            self.entries.append(tuple(node.entries))
+
+    def __len__(self) -> int:
+        return len(self.transitions)
+
+
 class raw(abc.ABC):  # wildcard annotation object
     ...
 
@@ -270,12 +424,40 @@ class ContextVarDispatcher(BaseDispatcher):
         return self.data_ctx.get().get(interface.name)
 
 
+class InContext(Awaitable[T]):
+    """在给定的 Context 中逐步执行 awaitable.
+
+    与 `loop.create_task(awaitable, context=context)` 一样, awaitable 对 ContextVar 的修改只留在 context 中,
+    但由当前任务直接驱动, 不创建 Task.
+    """
+
+    __slots__ = ("context", "awaitable")
+
+    def __init__(self, context: Context, awaitable: Awaitable[T]) -> None:
+        self.context: Context = context
+        self.awaitable: Awaitable[T] = awaitable
+
+    def __await__(self) -> Generator[Any, Any, T]:
+        run = self.context.run
+        iterator = run(self.awaitable.__await__)
+        send, throw = iterator.send, iterator.throw  # type: ignore
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            try:
+                yielded = run(send, value) if error is None else run(throw, error)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:  # cancellation and close() go to the awaitable, as in a Task
+                value, error = None, e
+
+
 ChainContent = List[Union[str, Element]]
 
 ChainContentList = List[ChainContent]
 
-split_cache: MutableMapping[MessageChain, ChainContentList] = WeakKeyDictionary()
-
 quote_pairs = {"'": "'", '"': '"', "‘": "’", "“": "”"}
 
 
@@ -284,46 +466,320 @@ def extract_str(buf: ChainContent) -> str | None:
         return buf[0]
 
 
-def split(chain: MessageChain) -> ChainContentList:
-    if chain in split_cache:
-        return split_cache[chain]
-    result: ChainContentList = []
+SPLIT_WINDOW = 256
+"""分词时一次切分的最大文本长度, 限制了只取前几个 token 时多做的工作"""
+
+_unquoted_special = re.compile("[\\\\" + re.escape("".join(quote_pairs)) + "]")
+"""引号外需要逐个处理的字符: 转义符与左引号"""
+
+
+def _split_text(text: str, quote: str, buffer: ChainContent) -> Generator[ChainContent, None, Tuple[str, ChainContent]]:
+    """对单个 Text 分词, 返回结束时所处的引号与未完成的 buffer.
+
+    引号外的普通文本按 `SPLIT_WINDOW` 分段, 每段以 `str.split` 一次切分, 只有转义符与引号会被单独处理.
+    """
+    cache: List[str] = []
+    index, length = 0, len(text)
+    while index < length:
+        if quote:  # spaces are kept inside quotes, only the escape and the closing quote matter
+            if (end := text.find(quote, index)) == -1:
+                end = length
+            if (escape := text.find("\\", index, end)) != -1:
+                end = escape
+            if end > index:
+                cache.append(text[index:end])
+        else:  # split at most a window of plain text at once, up to the next escape or quote
+            stop = min(length, index + SPLIT_WINDOW)
+            match = _unquoted_special.search(text, index, stop)
+            end = match.start() if match else stop
+            if end > index:
+                parts = text[index:end].split(" ")
+                if parts[0]:
+                    cache.append(parts[0])
+                if len(parts) > 1:
+                    if cache or buffer:
+                        if cache:
+                            buffer.append("".join(cache))
+                            cache.clear()
+                        yield buffer
+                        buffer = []  # buffer is "move"d, so DO NOT clear.
+                    yield from [[part] for part in parts[1:-1] if part]  # words between two spaces stand alone
+                    if parts[-1]:
+                        cache.append(parts[-1])  # may continue in the next window
+            if match is None:
+                index = end
+                continue
+        if end == length:
+            break
+        char = text[end]
+        if char == "\\":
+            index = end + 2  # the escaped character is dropped as well
+        else:
+            quote = "" if quote else quote_pairs[char]
+            index = end + 1
+    if cache:
+        buffer.append("".join(cache))
+    return quote, buffer
+
+
+def iter_split(chain: MessageChain) -> Iterator[ChainContent]:
+    """逐个产生 chain 分词后的 ChainContent, 可以在任意位置停止.
+
+    迭代器只引用 chain 的元素列表, 不引用 chain 本身.
+    """
+    return _iter_split(chain.content)
+
+
+def _iter_split(content: Iterable[Element]) -> Iterator[ChainContent]:
     quote: str = ""
     buffer: ChainContent = []
 
-    for elem in chain.content:
+    for elem in content:
         if elem.__class__.__name__ == "Quote":
             continue
         if not isinstance(elem, Text):
             buffer.append(elem)
             continue
-        cache: list[str] = []
-        skipping: bool = False
-        for char in elem.text:
-            if char == "\\" or skipping:
-                skipping = not skipping
-                continue
-            if char in quote_pairs and not quote:
-                quote = quote_pairs[char]
-                continue
-            elif char == quote:
-                quote = ""
-                continue
-            if char == " " and (cache or buffer) and not quote:
-                if cache:
-                    buffer.append("".join(cache))
-                    cache.clear()
-                if buffer:
-                    result.append(buffer)
-                    buffer = []  # buffer is "move"d, so DO NOT clear.
-            elif quote or char != " ":
-                cache.append(char)
-        if cache:
-            buffer.append("".join(cache))
+        quote, buffer = yield from _split_text(elem.text, quote, buffer)
     if buffer:
-        result.append(buffer)
-    split_cache[chain] = result
-    return result
+        yield buffer
+
+
+class LazySplit(Sequence[ChainContent]):
+    """按需分词的 ChainContent 序列.
+
+    下标访问只会分词到所需位置, `len` 与负数下标会完成全部分词.
+    """
+
+    __slots__ = ("_frags", "_iter", "_on_complete")
+
+    def __init__(
+        self,
+        frags: Iterable[ChainContent],
+        on_complete: Callable[[ChainContentList], Any] | None = None,
+    ) -> None:
+        """
+        Args:
+            frags (Iterable[ChainContent]): 已完成的分词结果, 或是 `iter_split` 产生的迭代器
+            on_complete (Callable[[ChainContentList], Any], optional): 分词完成时以完整结果调用
+        """
+        self._frags: ChainContentList = frags if isinstance(frags, list) else []
+        self._iter: Iterator[ChainContent] | None = None if isinstance(frags, list) else iter(frags)
+        self._on_complete = on_complete
+
+    def reach(self, index: int) -> bool:
+        """分词直到下标 index, 返回该位置是否存在 ChainContent"""
+        frags = self._frags
+        while len(frags) <= index and self._iter is not None:
+            frag = next(self._iter, None)
+            if frag is None:
+                self._iter = None
+                if self._on_complete:
+                    self._on_complete(frags)
+            else:
+                frags.append(frag)
+        return index < len(frags)
+
+    def force(self) -> ChainContentList:
+        """完成全部分词, 返回结果列表"""
+        while self._iter is not None:
+            self.reach(len(self._frags))
+        return self._frags
+
+    @property
+    def complete(self) -> bool:
+        return self._iter is None
+
+    def __getitem__(self, item: Any) -> Any:
+        if isinstance(item, slice):
+            if item.stop is None or item.stop < 0 or (item.start or 0) < 0:
+                self.force()
+            else:
+                self.reach(item.stop - 1)
+        elif item >= 0:
+            self.reach(item)
+        else:
+            self.force()
+        return self._frags[item]
+
+    def __len__(self) -> int:
+        return len(self.force())
+
+    def __iter__(self) -> Iterator[ChainContent]:
+        index = 0
+        while self.reach(index):
+            yield self._frags[index]
+            index += 1
+
+    def __repr__(self) -> str:
+        return f"LazySplit({self._frags!r}{'' if self.complete else ', ...'})"
+
+
+def reach(frags: Sequence[ChainContent], index: int) -> bool:
+    """frags 中是否存在下标为 index 的 ChainContent, 对 LazySplit 只分词到 index 为止"""
+    return frags.reach(index) if isinstance(frags, LazySplit) else index < len(frags)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int | None
+
+
+class SplitCache(abc.ABC):
+    """`split` 结果的缓存"""
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    @abc.abstractmethod
+    def lookup(self, chain: MessageChain) -> ChainContentList | None:
+        """查找 chain 的缓存结果, 不存在时返回 None"""
+        ...
+
+    @abc.abstractmethod
+    def store(self, chain: MessageChain, result: ChainContentList) -> None:
+        """保存 chain 的分词结果"""
+        ...
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @property
+    def maxsize(self) -> int | None:
+        return None
+
+    def split(self, chain: MessageChain) -> ChainContentList:
+        """对 chain 分词, 优先使用缓存"""
+        if (result := self.lookup(chain)) is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = list(iter_split(chain))
+        self.store(chain, result)
+        return result
+
+    def lazy(self, chain: MessageChain) -> LazySplit:
+        """按需对 chain 分词, 完整分词后的结果会被缓存.
+
+        返回的 LazySplit 不引用 chain, 可以存放在以 chain 为弱引用键的 `DerivedCache` 中.
+        """
+        if (result := self.lookup(chain)) is not None:
+            self.hits += 1
+            frags = LazySplit(result)
+        else:
+            self.misses += 1
+            snapshot = content_snapshot(chain)
+            frags = LazySplit(iter_split(chain), functools.partial(self._complete, weakref.ref(chain), snapshot))
+        return frags
+
+    def _complete(
+        self, ref: weakref.ref[MessageChain], snapshot: list[str | Element], result: ChainContentList
+    ) -> None:
+        if (chain := ref()) is not None and content_snapshot(chain) == snapshot:
+            self.store(chain, result)
+
+    def first(self, chain: MessageChain) -> ChainContent | None:
+        """获取 chain 分词后的第一个 ChainContent, 未命中缓存时不对剩余部分分词"""
+        if (result := self.lookup(chain)) is not None:
+            return result[0] if result else None
+        return next(iter_split(chain), None)
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self), self.maxsize)
+
+
+class WeakSplitCache(SplitCache):
+    """以 MessageChain 对象为键的缓存, 随消息链被回收"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.data: MutableMapping[MessageChain, ChainContentList] = WeakKeyDictionary()
+
+    def lookup(self, chain: MessageChain) -> ChainContentList | None:
+        return self.data.get(chain)
+
+    def store(self, chain: MessageChain, result: ChainContentList) -> None:
+        self.data[chain] = result
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class LRUSplitCache(SplitCache):
+    """以消息内容为键, 按最近使用淘汰的缓存.
+
+    内容相同的不同消息链对象共享同一结果. 含有非文本元素的消息链不会被缓存,
+    因为分词结果中包含元素对象本身.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        Args:
+            maxsize (int, optional): 最多缓存的结果数
+        """
+        super().__init__()
+        self._maxsize: int = maxsize
+        self.data: OrderedDict[tuple[str, ...], ChainContentList] = OrderedDict()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @staticmethod
+    def fingerprint(chain: MessageChain) -> tuple[str, ...] | None:
+        texts: list[str] = []
+        for elem in chain.content:
+            if isinstance(elem, Text):
+                texts.append(elem.text)
+            elif elem.__class__.__name__ != "Quote":
+                return None
+        return tuple(texts)
+
+    def lookup(self, chain: MessageChain) -> ChainContentList | None:
+        if (key := self.fingerprint(chain)) is None or (result := self.data.get(key)) is None:
+            return None
+        self.data.move_to_end(key)
+        return result
+
+    def store(self, chain: MessageChain, result: ChainContentList) -> None:
+        if (key := self.fingerprint(chain)) is None:
+            return
+        self.data[key] = result
+        if len(self.data) > self._maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+split_cache: SplitCache = LRUSplitCache()
+"""未指定缓存的 Commander 共用的默认缓存"""
+
+
+def split(chain: MessageChain) -> ChainContentList:
+    return split_cache.split(chain)
+
+
+def first_frag(chain: MessageChain) -> ChainContent | None:
+    """获取 chain 分词后的第一个 ChainContent, 不对剩余部分分词."""
+    return split_cache.first(chain)
 
 
 def const_fn(value: T) -> Callable[[], T]:
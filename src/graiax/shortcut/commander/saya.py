@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Union
+from typing import Callable, Dict, List, Optional, Union
 
 from graia.broadcast.entities.decorator import Decorator
 from graia.broadcast.entities.dispatcher import BaseDispatcher
@@ -7,7 +7,7 @@ from graia.saya.behaviour import Behaviour
 from graia.saya.cube import Cube
 from graia.saya.schema import BaseSchema
 
-from . import Arg, Commander, Slot
+from . import Arg, Commander, ConcurrencyLimit, Propagation, Slot
 
 
 @dataclass
@@ -19,6 +19,8 @@ class CommandSchema(BaseSchema):
     dispatchers: List[BaseDispatcher] = field(default_factory=list)
     decorators: List[Decorator] = field(default_factory=list)
     priority: int = 16
+    limit: Optional[ConcurrencyLimit] = None
+    propagation: Propagation = "wait"
 
     def register(self, func: Callable, commander: Commander):
         """注册 func 至 commander
@@ -27,7 +29,15 @@ class CommandSchema(BaseSchema):
             func (Callable): 命令函数
             commander (Commander): 命令对象
         """
-        commander.command(self.command, self.settings, self.dispatchers, self.decorators, self.priority)(func)
+        commander.command(
+            self.command,
+            self.settings,
+            self.dispatchers,
+            self.decorators,
+            self.priority,
+            limit=self.limit,
+            propagation=self.propagation,
+        )(func)
 
 
 class CommanderBehaviour(Behaviour):
@@ -47,7 +57,7 @@ class CommanderBehaviour(Behaviour):
             return
         for entry in self.commander.entries:
             if entry.callable is cube.content:
-                self.commander.entries.remove(entry)  # refs buried in MatchNode should be released
+                self.commander.unregister(entry)
                 break
 
         return True
@@ -6,6 +6,8 @@ import re
 import weakref
 from collections import defaultdict
 from typing import (
+    Any,
+    Callable,
     ClassVar,
     DefaultDict,
     Dict,
@@ -14,6 +16,7 @@ from typing import (
     Optional,
     Tuple,
     Type,
+    TypeVar,
     Union,
 )
 
@@ -27,12 +30,27 @@ from graia.broadcast.interfaces.dispatcher import DispatcherInterface
 from typing_extensions import get_args
 
 from ._typing_util import generic_issubclass, is_subclass, is_union
-from ._util import map_chain, unmap_chain
+from ._util import (
+    KeywordAutomaton,
+    derived_cache,
+    literal_runs,
+    map_chain,
+    plain_text,
+    text_runs,
+    unmap_chain,
+)
+
+T = TypeVar("T")
 
 
 class ChainDecorator(abc.ABC, Decorator, Derive[MessageChain]):
     pre = True
 
+    @staticmethod
+    def derive(chain: MessageChain, factory: Callable[[MessageChain], T]) -> T:
+        """获取 `factory(chain)`, 同一条消息在所有监听器间只计算一次, 结果不应被修改"""
+        return derived_cache.get(chain, factory)
+
     @abc.abstractmethod
     async def __call__(self, chain: MessageChain, interface: DispatcherInterface) -> Optional[MessageChain]:
         ...
@@ -82,18 +100,25 @@ class DetectSuffix(ChainDecorator):
 
 
 class ContainKeyword(ChainDecorator):
-    """消息中含有指定关键字"""
+    """消息中含有指定关键字
+
+    所有实例的关键字都在初始化时登记到同一个自动机中, 每条消息只扫描一次.
+    """
+
+    keyword_automaton: ClassVar[KeywordAutomaton] = KeywordAutomaton()
 
     def __init__(self, keyword: str) -> None:
         """初始化
 
         Args:
-            keyword (str): 关键字
+            keyword (str): 关键字, 不能跨越非文本元素
         """
         self.keyword: str = keyword
+        self.keyword_automaton.add(keyword)
+        weakref.finalize(self, self.keyword_automaton.remove, keyword)
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
-        if self.keyword not in chain:
+        if self.keyword not in self.keyword_automaton.search(self.derive(chain, text_runs)):
             raise ExecutionStop
         return chain
 
@@ -110,37 +135,114 @@ class MatchContent(ChainDecorator):
         self.content: Union[str, MessageChain] = content
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
-        if isinstance(self.content, str) and str(chain) != self.content:
+        if isinstance(self.content, str) and self.derive(chain, str) != self.content:
             raise ExecutionStop
         if isinstance(self.content, MessageChain) and chain != self.content:
             raise ExecutionStop
         return chain
 
 
+class RegexRouter:
+    """MatchRegex 的正则表达式路由.
+
+    登记的正则表达式会提取必然出现的字面量 (开头的前缀与最长的一段), 消息中缺少它们时不运行正则表达式;
+    相同的正则表达式在同一条消息上只运行一次, 结果由各监听器共用.
+
+    适用于没有字面量前缀而需要扫描整条消息的正则表达式 (如 `.*关键字.*`), 或被多个监听器重复使用的正则表达式.
+    以字面量开头的正则表达式在不匹配时本身就会立即失败, 经由路由不会更快.
+
+    Example:
+        >>> router = RegexRouter()
+        >>> weather = MatchRegex("/weather (?P<city>.+)", router=router)
+        >>> stock = MatchRegex("/stock (?P<code>[0-9]+)", router=router)
+    """
+
+    def __init__(self, cache_size: int = 64) -> None:
+        """
+        Args:
+            cache_size (int, optional): 保留结果的最近消息数
+        """
+        self.routes: Dict[Tuple[re.Pattern, bool], List[Any]] = {}  # [count, match function]
+        self.results: Dict[str, Dict[Callable[[str], Optional[re.Match]], Optional[re.Match]]] = {}
+        self.cache_size: int = cache_size
+
+    def add(self, pattern: re.Pattern, full: bool = True) -> Callable[[str], Optional[re.Match]]:
+        """登记正则表达式
+
+        Args:
+            pattern (re.Pattern): 正则表达式
+            full (bool, optional): 是否要求完全匹配
+
+        Returns:
+            Callable[[str], Optional[re.Match]]: 经由路由的匹配函数, 与 `pattern.fullmatch` / `pattern.match` 等价
+        """
+        if (route := self.routes.get((pattern, full))) is None:
+            route = self.routes[(pattern, full)] = [0, self._route(pattern, full)]
+        route[0] += 1
+        return route[1]
+
+    def remove(self, pattern: re.Pattern, full: bool = True) -> None:
+        if (route := self.routes.get((pattern, full))) is None:
+            return
+        route[0] -= 1
+        if not route[0]:
+            del self.routes[(pattern, full)]
+
+    def _route(self, pattern: re.Pattern, full: bool) -> Callable[[str], Optional[re.Match]]:
+        runs = literal_runs(pattern)
+        prefix, required = runs[0], max(runs, key=len)
+        match_func = pattern.fullmatch if full else pattern.match
+        cache = self.results
+
+        def match(string: str) -> Optional[re.Match]:
+            if not string.startswith(prefix) or required not in string:
+                return None
+            if (results := cache.get(string)) is None:
+                if len(cache) >= self.cache_size:
+                    del cache[next(iter(cache))]
+                results = cache[string] = {}
+            elif match in results:
+                return results[match]
+            result = results[match] = match_func(string)
+            return result
+
+        return match
+
+
 class MatchRegex(ChainDecorator, BaseDispatcher):
     """匹配正则表达式"""
 
-    def __init__(self, regex: str, flags: re.RegexFlag = re.RegexFlag(0), full: bool = True) -> None:
+    def __init__(
+        self,
+        regex: str,
+        flags: re.RegexFlag = re.RegexFlag(0),
+        full: bool = True,
+        router: Optional[RegexRouter] = None,
+    ) -> None:
         """初始化匹配正则表达式.
 
         Args:
             regex (str): 正则表达式
             flags (re.RegexFlag): 正则表达式标志
             full (bool): 是否要求完全匹配, 默认为 True.
+            router (RegexRouter, optional): 共用的正则表达式路由, 默认每个实例单独匹配.
         """
         self.regex: str = regex
         self.flags: re.RegexFlag = flags
         self.pattern = re.compile(self.regex, self.flags)
         self.match_func = self.pattern.fullmatch if full else self.pattern.match
+        if router is not None:
+            self.match_func = router.add(self.pattern, full)
+            weakref.finalize(self, router.remove, self.pattern, full)
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
-        if not self.match_func(str(chain)):
+        if not self.match_func(self.derive(chain, str)):
             raise ExecutionStop
         return chain
 
     async def beforeExecution(self, interface: DispatcherInterface):
         chain: MessageChain = await interface.lookup_param("message_chain", MessageChain, None)
-        _mapping_str, _map = map_chain(chain)
+        _mapping_str, _map = self.derive(chain, map_chain)
         if res := self.match_func(_mapping_str):
             interface.local_storage["__parser_regex_match_obj__"] = res
             interface.local_storage["__parser_regex_match_map__"] = _map
@@ -185,7 +287,14 @@ class RegexGroup(Decorator):
 
 
 class MatchTemplate(ChainDecorator):
-    """模板匹配"""
+    """模板匹配
+
+    模板在初始化时编译. 每个位置所需的元素类型构成模板的形状, 消息的元素类型序列与形状是否相容
+    记录在所有实例共用的索引中, 形状不相容的模板不会逐个检查元素.
+    """
+
+    shape_index: ClassVar["Dict[Tuple[type, ...], Dict[Tuple[Tuple[type, ...], ...], bool]]"] = {}
+    shape_index_size: ClassVar[int] = 1024
 
     def __init__(self, template: List[Union[Type[Element], Element, str]]) -> None:
         """初始化
@@ -214,19 +323,39 @@ class MatchTemplate(ChainDecorator):
                     self.template[-1] += pattern
                 else:
                     self.template.append(pattern)
+        # 元素实例只能逐个比较, 形状上不作限制
+        self.shape: Tuple[Tuple[type, ...], ...] = tuple(
+            t if isinstance(t, tuple) else (Text,) if isinstance(t, str) else (object,) for t in self.template
+        )
+        self.checks: List[Tuple[int, Union[Element, "re.Pattern[str]"]]] = [
+            (index, re.compile(t) if isinstance(t, str) else t)
+            for index, t in enumerate(self.template)
+            if not isinstance(t, tuple)
+        ]
+
+    def compatible(self, signature: Tuple[type, ...]) -> bool:
+        """元素类型序列为 signature 的消息链是否可能匹配"""
+        if (shapes := self.shape_index.get(signature)) is None:
+            if len(self.shape_index) >= self.shape_index_size:
+                self.shape_index.clear()
+            shapes = self.shape_index[signature] = {}
+        if (result := shapes.get(self.shape)) is None:
+            result = shapes[self.shape] = len(signature) == len(self.shape) and all(
+                issubclass(elem_type, types) for elem_type, types in zip(signature, self.shape)
+            )
+        return result
 
     def match(self, chain: MessageChain):
         """匹配消息链"""
-        if len(self.template) != len(chain):
+        content = chain.content
+        if len(content) != len(self.shape) or not self.compatible(tuple(map(type, content))):
             return False
-        for element, template in zip(chain, self.template):
-            if isinstance(template, tuple) and not isinstance(element, template):
-                return False
-            elif isinstance(template, Element) and element != template:
-                return False
-            elif isinstance(template, str):
-                if not isinstance(element, Text) or not re.match(template, element.text):
+        for index, check in self.checks:
+            if isinstance(check, Element):
+                if content[index] != check:
                     return False
+            elif not check.match(content[index].text):
+                return False
         return True
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
@@ -254,13 +383,7 @@ class FuzzyMatch(ChainDecorator):
 
     def match(self, chain: MessageChain):
         """匹配消息链"""
-        text_frags: List[str] = []
-        for element in chain:
-            if isinstance(element, Text):
-                text_frags.append(element.text)
-            else:
-                text_frags.append(str(element))
-        text = "".join(text_frags)
+        text = self.derive(chain, plain_text)
         matcher = difflib.SequenceMatcher(a=text, b=self.template)
         # return false when **any** ratio calc falls undef the rate
         if matcher.real_quick_ratio() < self.min_rate:
@@ -296,13 +419,7 @@ class FuzzyDispatcher(BaseDispatcher):
         event = interface.event
         if id(event) not in self.event_ref:
             chain: MessageChain = await interface.lookup_param("message_chain", MessageChain, None)
-            text_frags: List[str] = []
-            for element in chain:
-                if isinstance(element, Text):
-                    text_frags.append(element.text)
-                else:
-                    text_frags.append(str(element))
-            text = "".join(text_frags)
+            text = derived_cache.get(chain, plain_text)
             matcher = difflib.SequenceMatcher()
             matcher.set_seq2(text)
             rate_calc = self.event_ref[id(event)] = {}
@@ -0,0 +1,31 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+import pytest
+from graia.broadcast import Broadcast
+
+from graiax.shortcut.commander import Commander, LRUSplitCache
+
+
+@pytest.fixture
+def loop() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def make_commander(loop: asyncio.AbstractEventLoop) -> Callable[..., Commander]:
+    """在 `loop` 上创建 Commander, 每个 Commander 使用各自的 Broadcast 与分词缓存"""
+
+    def make(**options: Any) -> Commander:
+        options.setdefault("split_cache", LRUSplitCache())
+        return Commander(Broadcast(loop=loop), ContextVar("event"), **options)
+
+    return make
+
+
+@pytest.fixture
+def commander(make_commander: Callable[..., Commander]) -> Commander:
+    return make_commander()
@@ -0,0 +1,263 @@
+"""测试用的参照实现与随机输入.
+
+参照实现为各优化之前逐个处理的原始实现, benchmarks 也以它们作为对比的基线.
+"""
+from __future__ import annotations
+
+import random
+import re
+from typing import (
+    Any,
+    Coroutine,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from graia.amnesia.message import Element, MessageChain, Text
+from graia.broadcast import Dispatchable
+from graia.broadcast.entities.dispatcher import BaseDispatcher
+from graia.broadcast.exceptions import ExecutionStop
+from graia.broadcast.interfaces.dispatcher import DispatcherInterface
+
+from graiax.shortcut.commander import CommandEntry
+from graiax.shortcut.commander._util import (
+    SPLIT_WINDOW,
+    ChainContent,
+    ChainContentList,
+    extract_str,
+    quote_pairs,
+)
+from graiax.shortcut.text_parser import ContainKeyword, MatchTemplate
+
+WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet",
+    "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango",
+]  # fmt: skip
+
+
+class At(Element):
+    def __init__(self, target: int) -> None:
+        self.target = target
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, At) and other.target == self.target
+
+    __hash__ = Element.__hash__
+
+    def __repr__(self) -> str:
+        return f"At({self.target})"
+
+
+class Face(Element):
+    def __repr__(self) -> str:
+        return "Face()"
+
+
+class Quote(Element):
+    """与真实的回复元素同名, 分词时应被跳过"""
+
+
+class MessageEvent(Dispatchable):
+    def __init__(self, chain: MessageChain) -> None:
+        self.chain = chain
+
+    class Dispatcher(BaseDispatcher):
+        @staticmethod
+        async def catch(interface: DispatcherInterface):
+            if interface.name == "message_chain":
+                return interface.event.chain
+
+
+def run(coro: Coroutine[Any, Any, Optional[MessageChain]]) -> str:
+    """同步执行检测器, 结果以 repr 比较 (MessageChain 不按内容判等)"""
+    try:
+        coro.send(None)
+    except StopIteration as result:
+        return repr(result.value)
+    except ExecutionStop:
+        return "stop"
+    raise RuntimeError("detector suspended")
+
+
+def reference_split(chain: MessageChain) -> Iterator[ChainContent]:
+    """逐字符分词的原始实现"""
+    quote: str = ""
+    buffer: ChainContent = []
+
+    for elem in chain.content:
+        if elem.__class__.__name__ == "Quote":
+            continue
+        if not isinstance(elem, Text):
+            buffer.append(elem)
+            continue
+        cache: list[str] = []
+        skipping: bool = False
+        for char in elem.text:
+            if char == "\\" or skipping:
+                skipping = not skipping
+                continue
+            if char in quote_pairs and not quote:
+                quote = quote_pairs[char]
+                continue
+            elif char == quote:
+                quote = ""
+                continue
+            if char == " " and (cache or buffer) and not quote:
+                if cache:
+                    buffer.append("".join(cache))
+                    cache.clear()
+                if buffer:
+                    yield buffer
+                    buffer = []
+            elif quote or char != " ":
+                cache.append(char)
+        if cache:
+            buffer.append("".join(cache))
+    if buffer:
+        yield buffer
+
+
+def reference_scan(
+    index: int, frags: Sequence[ChainContent], params: Tuple[ChainContent, ...], entry: CommandEntry
+) -> Optional[Tuple[Dict[str, ChainContent], Dict[str, ChainContentList], ChainContentList]]:
+    """逐个 token 查找 Arg 头的原始实现"""
+    if not entry.header_map and not entry.wildcard and len(frags) > index + len(entry.optional):
+        return None
+    slot_data = {name: chain for targets, chain in zip(entry.slot_targets, params) for name in targets}
+    extras: ChainContentList = []
+    arg_data: Dict[str, ChainContentList] = {}
+    while index < len(frags):
+        if (str_frag := extract_str(frags[index])) in entry.header_map:
+            arg = entry.header_map[str_frag]
+            index += 1
+            if arg.dest:
+                if arg.dest in arg_data:
+                    return None
+                arg_data[arg.dest] = frags[index : index + len(arg.tags)]
+            index += len(arg.tags)
+            if index > len(frags):
+                return None
+            continue
+        extras.append(frags[index])
+        index += 1
+    if not entry.wildcard and len(extras) > len(entry.optional):
+        return None
+    if len(extras) < len(entry.optional):
+        extras.extend([] for _ in range(len(entry.optional) - len(extras)))
+    return slot_data, arg_data, extras
+
+
+def reference_distance(a: str, b: str) -> int:
+    """编辑距离 (相邻字符交换计为一次) 的动态规划实现"""
+    rows = [list(range(len(b) + 1))]
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            row[j] = min(rows[-1][j] + 1, row[j - 1] + 1, rows[-1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], rows[-2][j - 2] + 1)
+        rows.append(row)
+    return rows[-1][-1]
+
+
+def reference_suggest(words: Iterable[str], query: str, k: int = 3) -> List[Tuple[str, int]]:
+    """逐个计算编辑距离的 `Commander.suggest`"""
+    limit = min(2, max((len(query) - 1) // 2, 0))
+    found = ((word, reference_distance(query, word)) for word in set(words))
+    return sorted(((w, d) for w, d in found if d <= limit), key=lambda item: (item[1], item[0]))[:k]
+
+
+class ReferenceKeyword(ContainKeyword):
+    """逐个监听器调用 `keyword in chain` 的原始实现"""
+
+    async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
+        if self.keyword not in chain:
+            raise ExecutionStop
+        return chain
+
+
+class ReferenceTemplate(MatchTemplate):
+    """逐个元素检查, 每次调用 `re.match` 的原始实现"""
+
+    def match(self, chain: MessageChain):
+        if len(self.template) != len(chain):
+            return False
+        for element, template in zip(chain, self.template):
+            if isinstance(template, tuple) and not isinstance(element, template):
+                return False
+            elif isinstance(template, Element) and element != template:
+                return False
+            elif isinstance(template, str):
+                if not isinstance(element, Text) or not re.match(template, element.text):
+                    return False
+        return True
+
+
+SPLIT_ALPHABET = "ab  \\" + "".join(quote_pairs) + "".join(quote_pairs.values())
+
+
+def random_split_chain(rand: random.Random) -> MessageChain:
+    """含空格, 转义符, 各种引号与非文本元素的消息链, 包括跨越 `SPLIT_WINDOW` 的长文本"""
+    content: List[Element] = []
+    for _ in range(rand.randint(0, 5)):
+        roll = rand.random()
+        if roll < 0.7:
+            size = rand.randint(0, 12) if rand.random() < 0.95 else rand.randint(SPLIT_WINDOW - 8, SPLIT_WINDOW * 3)
+            content.append(Text("".join(rand.choice(SPLIT_ALPHABET) for _ in range(size))))
+        elif roll < 0.9:
+            content.append(At(rand.randint(1, 9)))
+        else:
+            content.append(Quote())
+    return MessageChain(content)
+
+
+def random_chain(rand: random.Random) -> MessageChain:
+    """由 a, b 与空格组成的短文本与少量 At"""
+    content: List[Element] = []
+    for _ in range(rand.randint(0, 3)):
+        if rand.random() < 0.8:
+            content.append(Text("".join(rand.choice("ab ") for _ in range(rand.randint(0, 6)))))
+        else:
+            content.append(At(1))
+    return MessageChain(content)
+
+
+def make_chain(length: int, rand: random.Random) -> MessageChain:
+    """At 后跟约 length 个字符的单词, 含有非文本元素, 因此 LRUSplitCache 不会缓存"""
+    words: List[str] = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rand.choice(WORDS))
+    return MessageChain([At(1), Text(" " + " ".join(words))])
+
+
+PATTERN_PIECES = [
+    "a", "b", "ab", "(a)", "(b+)", "(a|b)", "[ab]", "a*", "^",
+    "(?i:a)", "(?:ab)", " ", ".", r"\w", "(?=a)", r"\b", "(?:ba)+",
+]  # fmt: skip
+
+
+def random_pattern(rand: random.Random) -> re.Pattern:
+    """随机组合带有字面量前缀, 分组, 分支, 锚点与忽略大小写的正则表达式"""
+    flags = re.IGNORECASE if rand.random() < 0.1 else 0
+    return re.compile("".join(rand.choice(PATTERN_PIECES) for _ in range(rand.randint(1, 5))), flags)
+
+
+def describe(match: Optional[re.Match]) -> object:
+    return match and (match.span(), match.groups(), match.groupdict())
+
+
+def random_template(rand: random.Random) -> list:
+    """随机组合元素类型, Union, 元素实例, 通配符与 Text 模板"""
+    pieces = [At, Face, Union[At, Face], At(1), At(2), Text, "a*", "*b", "?", Text("ab")]
+    return [rand.choice(pieces) for _ in range(rand.randint(1, 4))]
+
+
+def random_template_chain(rand: random.Random) -> MessageChain:
+    pieces = [lambda: At(rand.randint(1, 2)), Face, lambda: Text("".join(rand.choice("ab") for _ in range(3)))]
+    return MessageChain([rand.choice(pieces)() for _ in range(rand.randint(0, 4))])
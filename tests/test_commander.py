@@ -0,0 +1,210 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+import pytest
+from graia.amnesia.message import MessageChain, Text
+from graia.broadcast.exceptions import PropagationCancelled
+
+from graiax.shortcut.commander import (
+    Commander,
+    CommandProfiler,
+    ConcurrencyLimit,
+    LRUSplitCache,
+    resolve_propagation,
+)
+from tests.reference import MessageEvent
+
+
+def test_handlers_get_their_own_chains(loop: asyncio.AbstractEventLoop, make_commander: Callable[..., Commander]):
+    split_cache = LRUSplitCache()
+    commanders = [make_commander(split_cache=split_cache) for _ in range(2)]
+    seen: List[str] = []
+    for commander in commanders:
+
+        @commander.command("echo {x} {y}")
+        def _(x: MessageChain, y: Optional[MessageChain]):
+            seen.extend((str(x), str(y)))
+            x.content.append("!")  # must not leak into the shared split
+            y.content.append("?")
+
+    for _ in range(2):
+        for commander in commanders:
+            loop.run_until_complete(commander.execute(MessageChain([Text("echo hi there")])))
+    assert seen == ["hi", "there"] * 4
+
+
+def test_execute_many_respects_limit(loop: asyncio.AbstractEventLoop, commander: Commander):
+    running: List[int] = []
+    done: List[str] = []
+    limit = ConcurrencyLimit(2)
+
+    @commander.command("work {n}", limit=limit)
+    async def _(n: str):
+        running.append(limit.running)
+        await asyncio.sleep(0)
+        done.append(n)
+
+    chains = [MessageChain([Text(f"work {n}")]) for n in range(5)]
+    loop.run_until_complete(commander.execute_many((chain, MessageEvent(chain)) for chain in chains))
+    assert sorted(done) == [str(n) for n in range(5)]
+    assert max(running) == 2
+    assert not limit.running and not limit.waiting
+
+
+def test_execute_many_isolates_propagation(loop: asyncio.AbstractEventLoop, commander: Commander):
+    seen: List[str] = []
+
+    @commander.command("ping {x}", priority=1)
+    def _(x: str):
+        seen.append(f"high {x}")
+        if x.startswith("stop"):
+            raise PropagationCancelled
+
+    @commander.command("ping {x}", priority=2)
+    def _(x: str):
+        seen.append(f"low {x}")
+
+    @commander.command("pong {x}")
+    def _(x: str):
+        seen.append(f"pong {x}")
+        raise PropagationCancelled
+
+    texts = ["ping stop1", "ping go1", "pong 1", "ping stop2", "ping go2"]
+    chains = [MessageChain([Text(text)]) for text in texts]
+    loop.run_until_complete(commander.execute_many((chain, MessageEvent(chain)) for chain in chains))
+    assert sorted(seen) == sorted(["high stop1", "high go1", "low go1", "pong 1", "high stop2", "high go2", "low go2"])
+
+
+marker: ContextVar[str] = ContextVar("marker", default="caller")
+
+
+@pytest.mark.parametrize("inline", [True, False])
+def test_inline_handler_context(make_commander: Callable[..., Commander], inline: bool):
+    commander = make_commander(inline=inline)
+    loop = commander.broadcast.loop
+    seen: List[tuple] = []
+
+    @commander.command("add {a} {b}", priority=1)
+    async def _(a: int, b: int):
+        seen.append((a + b, marker.get(), asyncio.current_task()))
+        marker.set("high")
+
+    @commander.command("add {a} {b}", priority=2)
+    async def _(a: str, b: str):
+        seen.append((a + b, marker.get(), asyncio.current_task()))
+        marker.set("low")
+
+    async def caller():
+        await commander.execute(MessageChain([Text("add 1 2")]))
+        return marker.get(), asyncio.current_task()
+
+    result, task = loop.run_until_complete(caller())
+    assert result == "caller"
+    assert [value for value, _, _ in seen] == [3, "12"]
+    assert [value for _, value, _ in seen] == ["caller", "caller"]
+    assert all((handler_task is task) == inline for _, _, handler_task in seen)
+
+
+def register_pair(commander: Commander, propagation: str, high: Callable, low: Callable) -> None:
+    """两个由 "ping" 触发的命令, 优先级较高的一个使用 propagation"""
+    commander.command("ping", priority=1, propagation=propagation)(high)  # type: ignore
+    commander.command("ping", priority=2)(low)
+
+
+@pytest.mark.parametrize("inline", [True, False])
+@pytest.mark.parametrize("propagation", ["wait", "early", "continue"])
+def test_higher_priority_starts_first(make_commander: Callable[..., Commander], propagation: str, inline: bool):
+    commander = make_commander(inline=inline)
+    events: List[str] = []
+
+    async def high():
+        events.append("high")
+        await asyncio.sleep(0)
+        events.append("high done")
+
+    async def low():
+        events.append("low")
+
+    register_pair(commander, propagation, high, low)
+    commander.broadcast.loop.run_until_complete(commander.execute(MessageChain([Text("ping")])))
+    assert sorted(events) == ["high", "high done", "low"]
+    assert events.index("high") < events.index("low")
+    if propagation != "continue":
+        assert events.index("high done") < events.index("low")
+
+
+@pytest.mark.parametrize("inline", [True, False])
+@pytest.mark.parametrize("propagation", ["wait", "early", "continue"])
+def test_stop_propagation(make_commander: Callable[..., Commander], propagation: str, inline: bool):
+    commander = make_commander(inline=inline)
+    events: List[str] = []
+
+    async def high():
+        if propagation == "early":
+            resolve_propagation(stop=True)
+            await asyncio.sleep(0)
+            events.append("high done")  # keeps running after the decision
+            return
+        raise PropagationCancelled
+
+    register_pair(commander, propagation, high, lambda: events.append("low"))
+    execution = commander.execute(MessageChain([Text("ping")]))
+    if propagation == "continue":  # not waited for, so it cannot stop anything
+        commander.broadcast.loop.run_until_complete(execution)
+        assert events == ["low"]
+        return
+    with pytest.raises(PropagationCancelled):
+        commander.broadcast.loop.run_until_complete(execution)
+    assert events == (["high done"] if propagation == "early" else [])
+
+
+@pytest.mark.parametrize("inline", [True, False])
+@pytest.mark.parametrize("propagation", ["wait", "early", "continue"])
+def test_cancel_cancels_handlers(make_commander: Callable[..., Commander], propagation: str, inline: bool):
+    commander = make_commander(inline=inline)
+    loop = commander.broadcast.loop
+    cancelled: List[str] = []
+
+    def handler(name: str) -> Callable:
+        async def wait_forever():
+            try:
+                await loop.create_future()
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+
+        return wait_forever
+
+    register_pair(commander, propagation, handler("high"), handler("low"))
+    task = loop.create_task(commander.execute(MessageChain([Text("ping")])))
+    for _ in range(5):
+        loop.run_until_complete(asyncio.sleep(0))
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        loop.run_until_complete(task)
+    loop.run_until_complete(asyncio.sleep(0))  # let the cancelled handlers unwind
+    # "continue" lets the lower priority start at once, the others hold it back
+    assert sorted(cancelled) == (["high", "low"] if propagation == "continue" else ["high"])
+
+
+def test_profiler_keeps_stats_on_entries(loop: asyncio.AbstractEventLoop, commander: Commander):
+    @commander.command("before {n}")
+    def _(n: str):
+        pass
+
+    profiler = commander.profiler = CommandProfiler(sample_every=2)
+
+    @commander.command("after {n}")
+    def _(n: str):
+        pass
+
+    for text in ["before 1", "after 1", "after 2", "after 3"]:
+        loop.run_until_complete(commander.execute(MessageChain([Text(text)])))
+    counts = {repr(row.entry): (row.attempts, row.dispatches) for row in profiler.report()}
+    assert sorted(counts.values()) == [(1, 1), (3, 3)]
+    assert all(entry.stats is profiler.entries[entry] for entry in commander.entries)
+
+    profiler.reset()
+    loop.run_until_complete(commander.execute(MessageChain([Text("before 2")])))
+    assert sorted((row.attempts, row.samples) for row in profiler.report()) == [(0, 0), (1, 0)]
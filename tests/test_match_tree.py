@@ -0,0 +1,150 @@
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Set, Union
+
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.commander import Arg, CommandEntry, Commander, Slot
+from graiax.shortcut.commander._util import MatchNode, split
+from tests.reference import WORDS
+
+
+class CommandSpec(NamedTuple):
+    command: str
+    settings: Dict[str, Union[Slot, Arg]]
+    sample: str  # 一条能触发该命令的消息
+
+
+def make_commands(count: int) -> List[CommandSpec]:
+    """生成 count 条混合了参数, 可选参数, wildcard 与 Arg 的命令, 每三条中有一条带有与下一条命令首 token 冲突的别名"""
+    specs: List[CommandSpec] = []
+    for index in range(count):
+        head = f"{WORDS[index % len(WORDS)]}{index}"
+        kind = index % 6
+        if kind == 0:
+            specs.append(CommandSpec(head, {}, head))
+        elif kind == 1:
+            specs.append(CommandSpec(f"[{head}|a{head}] {{target}}", {}, f"a{head} {WORDS[index % 5]}"))
+        elif kind == 2:
+            specs.append(CommandSpec(f"{head} {{count: int}} {{unit = 'x'}}", {}, f"{head} {index % 100}"))
+        elif kind == 3:
+            specs.append(CommandSpec(f"{head} say {{...content: raw}}", {}, f"{head} say {' '.join(WORDS[:5])}"))
+        elif kind == 4:
+            settings: Dict[str, Union[Slot, Arg]] = {
+                "verbose": Arg("[-v|--verbose]"),
+                "limit": Arg("--limit {limit}", int, 10),
+            }
+            specs.append(CommandSpec(f"{head} {{keyword}}", settings, f"{head} {WORDS[index % 5]} --limit 3 -v"))
+        else:
+            sub = WORDS[index % 7]
+            specs.append(CommandSpec(f"{head} {sub} {{a}} {{b}}", {}, f"{head} {sub} 1 2"))
+    for index, spec in enumerate(specs[:-1]):
+        head, _, rest = spec.command.partition(" ")
+        if index % 3 == 0 and not head.startswith("["):  # triggers the node copying in MatchNode.push
+            other = specs[index + 1].command.split(" ")[0].strip("[]").split("|")[0]
+            specs[index] = spec._replace(command=f"[{head}|{other}] {rest}".strip())
+    return specs
+
+
+SPECS = make_commands(300)
+
+
+def count_nodes(root: MatchNode[CommandEntry]) -> int:
+    visited: Set[int] = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) not in visited:
+            visited.add(id(node))
+            stack.extend(node.next.values())
+    return len(visited)
+
+
+def register(commander: Commander, specs: List[CommandSpec]) -> List[CommandEntry]:
+    """注册 specs, 返回与之一一对应的 entry"""
+
+    def make_handler() -> Callable[..., None]:
+        def handler(**kwargs: Any) -> None:
+            ...
+
+        return handler
+
+    handlers = {commander.command(spec.command, dict(spec.settings))(make_handler()): i for i, spec in enumerate(specs)}
+    entries: List[Any] = [None] * len(specs)
+    for entry in commander.entries:
+        if entry.callable in handlers:
+            entries[handlers[entry.callable]] = entry
+    return entries
+
+
+def unregister_all(commander: Commander) -> None:
+    for entry in list(commander.entries):
+        commander.unregister(entry)
+
+
+def fresh_root(make_commander: Callable[..., Commander], specs: List[CommandSpec]) -> MatchNode[CommandEntry]:
+    commander = make_commander()
+    register(commander, specs)
+    return commander.match_root
+
+
+def matched(commander: Commander, entries: List[CommandEntry], text: str) -> Set[int]:
+    """以命令在 SPECS 中的下标表示匹配结果, 使不同 Commander 的结果可以比较"""
+    index = {entry: i for i, entry in enumerate(entries)}
+    result = commander.match(split(MessageChain([Text(text)])))
+    return {index[entry] for pending in result.values() for entry, _ in pending}
+
+
+def test_reload_keeps_tree_bounded(make_commander: Callable[..., Commander]):
+    expected = count_nodes(fresh_root(make_commander, SPECS))
+    commander = make_commander()
+    register(commander, SPECS)
+    tracemalloc.start()
+    usage: List[int] = []
+    try:
+        for _ in range(10):
+            unregister_all(commander)
+            register(commander, SPECS)
+            gc.collect()
+            assert count_nodes(commander.match_root) == expected
+            assert len(commander.entries) == len(SPECS)
+            usage.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+    # the first rounds fill interning tables and caches; after that a reload must not keep anything
+    assert usage[-1] - usage[4] < usage[4] * 0.1, usage
+
+
+def test_partial_unregister_matches_fresh_tree(make_commander: Callable[..., Commander]):
+    commander = make_commander()
+    entries = register(commander, SPECS)
+    for entry in entries[1::2]:
+        commander.unregister(entry)
+    assert count_nodes(commander.match_root) == count_nodes(fresh_root(make_commander, SPECS[::2]))
+
+    kept = set(range(0, len(SPECS), 2))
+    fresh = make_commander()
+    fresh_entries = register(fresh, SPECS[::2])
+    for i, spec in enumerate(SPECS):
+        got = matched(commander, entries, spec.sample)
+        assert got <= kept, spec
+        assert {2 * j for j in matched(fresh, fresh_entries, spec.sample)} == got, spec
+
+
+def test_unregister_all_empties_root(commander: Commander):
+    register(commander, SPECS)
+    unregister_all(commander)
+    assert not commander.match_root.next
+    assert not commander.entries
+
+
+def test_unregister_rebuilds_automaton(commander: Commander):
+    ping = commander.command("ping {target}")(lambda target: None)
+    pong = commander.command("[ping|pong] {target}")(lambda target: None)
+    entries = {entry.callable: entry for entry in commander.entries}
+    assert len(matched(commander, [entries[ping], entries[pong]], "ping a")) == 2
+    commander.unregister(entries[ping])
+    assert matched(commander, [entries[ping], entries[pong]], "ping a") == {1}
+    assert matched(commander, [entries[ping], entries[pong]], "pong a") == {1}
+    commander.unregister(entries[pong])
+    assert not commander.match(split(MessageChain([Text("pong a")])))
@@ -0,0 +1,83 @@
+import random
+from typing import List
+
+import pytest
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut.commander import Arg, CommandEntry, Commander, TailIndex
+from graiax.shortcut.commander._util import split
+from tests.reference import WORDS, reference_scan
+
+FLAGS = ["-v", "-q", "--all", "--force", "-n", "--limit", "--user", "--tag"]
+
+
+def register(commander: Commander, count: int, seed: int) -> List[CommandEntry]:
+    """注册 count 个只在 Arg 与可选 Slot 上不同的重载命令"""
+    rand = random.Random(seed)
+    entries: List[CommandEntry] = []
+    for index in range(count):
+        flags = rand.sample(FLAGS, rand.randint(1, 4))
+        settings = {f"a{i}": Arg(f"{flag} {{value}}", str, "") if i % 2 else Arg(flag) for i, flag in enumerate(flags)}
+        command = "run {target} {...rest}" if index % 3 == 0 else "run {target} {extra = ''}"
+        func = commander.command(command, settings)(lambda **_: None)
+        entries.append(next(entry for entry in commander.entries if entry.callable is func))
+    return entries
+
+
+def make_message(length: int, rand: random.Random, unique: bool) -> MessageChain:
+    """unique 为 True 时每个 Arg 头至多出现一次, 否则会大量重复"""
+    if unique:
+        words = [rand.choice(WORDS) for _ in range(length)]
+        for flag in rand.sample(FLAGS, min(len(FLAGS), length // 4)):
+            words[rand.randrange(len(words))] = flag
+    else:
+        words = [rand.choice(FLAGS) if rand.random() < 0.3 else rand.choice(WORDS) for _ in range(length)]
+    return MessageChain([Text(" ".join(["run", *words]))])
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_shared_tail_index_matches_reference(commander: Commander, seed: int):
+    rand = random.Random(seed)
+    entries = register(commander, 24, seed)
+    # the Arg headers of the state the overloads end on, as used by `match`
+    automaton = commander.freeze()
+    headers = next(headers for state, headers in zip(automaton.entries, commander._arg_headers) if state)
+    for _ in range(500):
+        frags = split(make_message(rand.randint(0, 12), rand, unique=rand.random() < 0.5))
+        if len(frags) < 2:
+            continue
+        params = (frags[1],)
+        tail = TailIndex(frags, 2, headers)
+        assert [commander.scan_rest(2, frags, params, entry, tail) for entry in entries] == [
+            reference_scan(2, frags, params, entry) for entry in entries
+        ], frags
+
+
+def test_overloads_on_one_state(commander: Commander):
+    plain = commander.command("run {target}")(lambda target: None)
+    verbose = commander.command("run {target}", {"verbose": Arg("-v")})(lambda target, verbose: None)
+    limited = commander.command("run {target} {...rest}", {"limit": Arg("-n {limit}", int, 1)})(
+        lambda target, limit, rest: None
+    )
+
+    def match(text: str) -> dict:
+        result = commander.match(split(MessageChain([Text(text)])))
+        return {entry.callable: params for pending in result.values() for entry, params in pending}
+
+    found = match("run x")
+    assert set(found) == {plain, verbose, limited}
+    assert found[verbose]["verbose"] is False
+    assert found[limited]["limit"] == 1
+
+    found = match("run x -v")
+    assert set(found) == {verbose, limited}
+    assert found[verbose]["verbose"] is True
+    assert [str(chain) for chain in found[limited]["rest"]] == ["-v"]
+
+    found = match("run x -n 3 a b")
+    assert set(found) == {limited}
+    assert found[limited]["limit"] == 3
+    assert [str(chain) for chain in found[limited]["rest"]] == ["a", "b"]
+
+    assert not match("run x -n")  # the Arg is missing its value
+    assert not match("run x -n 2 -n 3")  # an Arg may only appear once
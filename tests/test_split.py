@@ -0,0 +1,110 @@
+import gc
+import random
+
+import pytest
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut._util import DerivedCache
+from graiax.shortcut.commander import LRUSplitCache, WeakSplitCache
+from graiax.shortcut.commander._util import SPLIT_WINDOW, LazySplit, iter_split
+from tests.reference import (
+    WORDS,
+    At,
+    Quote,
+    make_chain,
+    random_split_chain,
+    reference_split,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("", []),
+        ("  ping   pong ", [["ping"], ["pong"]]),
+        ('say "hello world" now', [["say"], ["hello world"], ["now"]]),
+        ("say “你好 世界” ‘a b’", [["say"], ["你好 世界"], ["a b"]]),
+        ("a\\ b c", [["ab"], ["c"]]),  # the escape and the escaped character are both dropped
+        ('a \\"b c', [["a"], ["b"], ["c"]]),
+        ("tail\\", [["tail"]]),
+        ('"unclosed quote', [["unclosed quote"]]),
+        ('a""b', [["ab"]]),
+    ],
+)
+def test_split_text(text: str, expected: list):
+    assert list(iter_split(MessageChain([Text(text)]))) == expected
+    assert list(reference_split(MessageChain([Text(text)]))) == expected
+
+
+def test_split_elements():
+    at = At(1)
+    chain = MessageChain([Quote(), Text("hi "), at, Text("there x"), Text("y")])
+    frags = list(iter_split(chain))
+    assert frags == [["hi"], [at, "there"], ["x", "y"]]
+    assert frags[1][0] is at
+
+
+def test_split_long_text_across_windows():
+    words = [f"w{i}" for i in range(SPLIT_WINDOW)]
+    text = " ".join(words) + ' "quoted ' + "x" * SPLIT_WINDOW + ' end"'
+    frags = list(iter_split(MessageChain([Text(text)])))
+    assert frags == [[word] for word in words] + [["quoted " + "x" * SPLIT_WINDOW + " end"]]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_split_matches_reference(seed: int):
+    rand = random.Random(seed)
+    for _ in range(2000):
+        chain = random_split_chain(rand)
+        expected, actual = list(reference_split(chain)), list(iter_split(chain))
+        assert actual == expected, chain.content
+        for got, want in zip(actual, expected):  # element objects must be passed through as-is
+            assert all(a is b or a == b and type(a) is type(b) for a, b in zip(got, want))
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_lazy_split_matches_full_split(seed: int):
+    rand = random.Random(seed)
+    for _ in range(500):
+        chain = random_split_chain(rand)
+        expected = list(iter_split(chain))
+        lazy = LazySplit(iter_split(chain))
+        depth = rand.randint(0, 4)
+        assert lazy.reach(depth) == (len(expected) > depth)
+        assert lazy[: depth + 1] == expected[: depth + 1]
+        assert list(lazy) == expected
+        assert len(lazy) == len(expected)
+
+
+@pytest.mark.parametrize("cache_type", [LRUSplitCache, WeakSplitCache])
+def test_split_cache_shares_and_refreshes(cache_type: type):
+    cache, derived = cache_type(), DerivedCache()
+    chain = MessageChain([Text("ping pong")])
+    first, second = derived.get(chain, cache.lazy), derived.get(chain, cache.lazy)
+    assert first is second
+    assert list(first) == [["ping"], ["pong"]]
+    assert cache.split(chain) == [["ping"], ["pong"]]
+    if cache_type is LRUSplitCache:  # keyed by content, in-place edits must not be served stale
+        chain.content[0].text = "pong ping"
+        assert list(derived.get(chain, cache.lazy)) == [["pong"], ["ping"]]
+
+
+@pytest.mark.parametrize("cache_type", [LRUSplitCache, WeakSplitCache])
+def test_shared_lazy_split_matches_split(cache_type: type):
+    rand = random.Random(0)
+    cache, derived = cache_type(), DerivedCache()
+    for _ in range(1000):
+        chain = make_chain(rand.randint(0, 40), rand)
+        if rand.random() < 0.3:
+            chain = MessageChain([Text(rand.choice(WORDS))])
+        for _ in range(rand.randint(1, 3)):
+            frags = derived.get(chain, cache.lazy)
+            frags.reach(rand.randint(0, 3))
+            assert repr(list(frags)) == repr(list(iter_split(chain))), chain.content
+        # WeakSplitCache is keyed by the object, as it always was
+        if cache_type is LRUSplitCache and rand.random() < 0.3:
+            chain.content[-1].text = rand.choice(WORDS)
+            assert repr(list(derived.get(chain, cache.lazy))) == repr(list(iter_split(chain))), chain.content
+    del chain, frags
+    gc.collect()
+    assert not derived  # no split is held after its chain is collected
@@ -0,0 +1,52 @@
+import random
+import string
+from typing import List
+
+import pytest
+
+from graiax.shortcut.commander import CommandEntry, Commander
+from tests.reference import WORDS, reference_suggest
+
+
+def mutate(rand: random.Random, word: str) -> str:
+    chars = list(word)
+    for _ in range(rand.randint(0, 2)):
+        pos = rand.randrange(len(chars) + 1)
+        op = rand.randrange(4)
+        if op == 0 and pos < len(chars):
+            chars[pos] = rand.choice(string.ascii_lowercase)
+        elif op == 1 and pos < len(chars) and len(chars) > 1:
+            del chars[pos]
+        elif op == 2 and pos + 1 < len(chars):
+            chars[pos], chars[pos + 1] = chars[pos + 1], chars[pos]
+        else:
+            chars.insert(pos, rand.choice(string.ascii_lowercase))
+    return "".join(chars)
+
+
+def headers(commander: Commander) -> List[str]:
+    return [header for entry in commander.entries for header in Commander._headers(entry)]
+
+
+def register(commander: Commander, rand: random.Random, count: int) -> List[CommandEntry]:
+    funcs = []
+    for _ in range(count):
+        head, alias = rand.sample(WORDS, 2)
+        command = f"[{head}|{mutate(rand, alias)}] {{x}}" if rand.random() < 0.3 else f"{mutate(rand, head)} {{x}}"
+        funcs.append(commander.command(command)(lambda x: None))
+    return [entry for entry in commander.entries if entry.callable in funcs]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_suggest_matches_reference(commander: Commander, seed: int):
+    rand = random.Random(seed)
+    register(commander, rand, 40)
+    assert commander._suggest_index is None  # built on the first suggest()
+    for _ in range(3):
+        for _ in range(100):
+            query = mutate(rand, rand.choice(headers(commander)) if rand.random() < 0.8 else rand.choice(WORDS))
+            assert commander.suggest(query) == reference_suggest(headers(commander), query), query
+        # the index built by the first round is kept up to date
+        for entry in rand.sample(sorted(commander.entries, key=lambda entry: sorted(entry.nodes[0])), 15):
+            commander.unregister(entry)
+        register(commander, rand, 15)
@@ -0,0 +1,114 @@
+import gc
+import random
+
+import pytest
+from graia.amnesia.message import MessageChain, Text
+
+from graiax.shortcut._util import (
+    derived_cache,
+    literal_runs,
+    map_chain,
+    plain_text,
+    text_runs,
+)
+from graiax.shortcut.text_parser import (
+    ContainKeyword,
+    DetectPrefix,
+    FuzzyMatch,
+    MatchContent,
+    MatchRegex,
+    MatchTemplate,
+    RegexRouter,
+)
+from tests.reference import (
+    At,
+    ReferenceKeyword,
+    ReferenceTemplate,
+    describe,
+    random_chain,
+    random_pattern,
+    random_template,
+    random_template_chain,
+    run,
+)
+
+
+def word(rand: random.Random, low: int) -> str:
+    return "".join(rand.choice("ab ") for _ in range(rand.randint(low, 4)))
+
+
+def shared_state() -> dict:
+    return dict(ContainKeyword.keyword_automaton.counts)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_keyword_matches_reference(seed: int):
+    rand = random.Random(seed)
+    before = shared_state()
+    detectors = [
+        (ContainKeyword(keyword), ReferenceKeyword(keyword))
+        for keyword in (word(rand, 1) for _ in range(rand.randint(1, 8)))
+    ]
+    for _ in range(200):
+        chain = random_chain(rand)
+        for new, old in detectors:
+            assert run(new(chain, None)) == run(old(chain, None)), (chain.content, vars(new))
+    del detectors, new, old
+    gc.collect()
+    assert shared_state() == before
+
+
+def test_prefix_uses_own_order():
+    chain = MessageChain([Text("/ping pong")])
+    assert run(DetectPrefix(["/", "/ping"])(chain, None)) == repr(MessageChain([Text("ping pong")]))
+    assert run(DetectPrefix(["/ping", "/"])(chain, None)) == repr(MessageChain([Text("pong")]))
+    assert run(DetectPrefix("!")(chain, None)) == "stop"
+    assert run(DetectPrefix("/")(MessageChain([At(1), Text("/ping")]), None)) == "stop"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_regex_router_matches_re(seed: int):
+    rand = random.Random(seed)
+    router = RegexRouter()
+    patterns = [(random_pattern(rand), rand.random() < 0.5) for _ in range(rand.randint(1, 20))]
+    funcs = [router.add(pattern, full) for pattern, full in patterns]
+    for _ in range(200):
+        string = "".join(rand.choice("abAB ") for _ in range(rand.randint(0, 8)))
+        for (pattern, full), func in zip(patterns, funcs):
+            runs = literal_runs(pattern)
+            expected = pattern.fullmatch(string) if full else pattern.match(string)
+            assert not expected or string.startswith(runs[0]) and all(run in string for run in runs), (pattern, runs)
+            assert describe(func(string)) == describe(expected), (pattern, full, string)
+            assert describe(func(string)) == describe(expected), (pattern, full, string)  # cached
+    for pattern, full in patterns:
+        router.remove(pattern, full)
+    assert not router.routes
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_template_matches_reference(seed: int):
+    rand = random.Random(seed)
+    detectors = [
+        (MatchTemplate(template), ReferenceTemplate(template))
+        for template in (random_template(rand) for _ in range(10))
+    ]
+    for _ in range(200):
+        chain = random_template_chain(rand)
+        for new, old in detectors:
+            assert run(new(chain, None)) == run(old(chain, None)), (chain.content, old.template)
+
+
+def test_decorators_share_derived_data():
+    chain = MessageChain([Text("ping "), At(1), Text(" pong")])
+    detectors = [MatchContent(str(chain)), MatchRegex("ping.*"), FuzzyMatch("ping  pong"), ContainKeyword("pong")]
+    assert [run(detector(chain, None)) for detector in detectors] == [repr(chain)] * 4
+    derived = derived_cache.data[chain][1]
+    assert set(derived) == {str, plain_text, text_runs}
+    assert derived_cache.get(chain, map_chain) is derived_cache.get(chain, map_chain)
+    chain.content[0].text = "pang "  # edited in place by a listener of an earlier priority
+    assert [run(detector(chain, None)) for detector in detectors] == ["stop", "stop", repr(chain), repr(chain)]
+    assert derived_cache.data[chain][1] is not derived
+    size = len(derived_cache)
+    del chain
+    gc.collect()
+    assert len(derived_cache) == size - 1  # released with its chain